@@ -18,7 +18,9 @@ from .const import DOMAIN
 
 # Add all platforms including new FAN platform for pump control
 # Note: NUMBER platform removed as pump control is now handled by FAN platform
-PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.FAN, Platform.SWITCH, Platform.CLIMATE]
+PLATFORMS: list[Platform] = [
+    Platform.LIGHT, Platform.FAN, Platform.SWITCH, Platform.CLIMATE, Platform.SENSOR
+]
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -57,15 +59,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
 
+    hub = PentairCloudHub(_LOGGER)
     try:
-        hub = PentairCloudHub(_LOGGER)
-        if not await hass.async_add_executor_job(
+        if not await hub.async_run(
             hub.authenticate, entry.data["username"], entry.data["password"]
         ):
+            hub.shutdown()
             return False
 
-        await hass.async_add_executor_job(hub.populate_AWS_and_data_fields)
+        await hub.async_run(hub.populate_AWS_and_data_fields)
     except Exception as err:
+        hub.shutdown()
         _LOGGER.error("Exception while setting up Pentair Cloud. Will retry. %s", err)
         raise ConfigEntryNotReady(
             f"Exception while setting up Pentair Cloud. Will retry. {err}"
@@ -75,11 +79,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     coordinator = PentairDataUpdateCoordinator(hass, hub)
     
     # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        hub.shutdown()
+        raise
 
     hass.data[DOMAIN][entry.entry_id] = {
-        "pentair_cloud_hub": hub,  # Keep for backward compatibility
-        "hub": hub,  # New consistent key
+        "hub": hub,
+        "devices": hub.get_devices(),
         "coordinator": coordinator,  # Data update coordinator
         "pump_fan": None  # Will be set by fan platform
     }
@@ -92,6 +100,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data["hub"].shutdown()
 
     return unload_ok
\ No newline at end of file
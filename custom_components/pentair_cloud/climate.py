@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime
 import logging
 from typing import Any
 
@@ -11,13 +12,28 @@ from homeassistant.components.climate import (
     HVACMode,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import (
+    ATTR_TEMPERATURE,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    UnitOfTemperature,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
 from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEBUG_INFO
+from .const import (
+    DOMAIN,
+    DEBUG_INFO,
+    RELAY_PROGRAM_HEATER,
+    SIGNAL_PUMP_SPEED_CHANGED,
+)
 from .pentaircloud_modified import PentairCloudHub, PentairDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,6 +43,12 @@ MIN_TEMP = 60  # °F
 MAX_TEMP = 104  # °F
 
 
+def _normalize_setpoint(temperature: Any) -> int | float:
+    """Return whole-degree setpoints as int, matching the 1°F target step."""
+    temperature = float(temperature)
+    return int(temperature) if temperature.is_integer() else temperature
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -41,14 +63,17 @@ async def async_setup_entry(
         _LOGGER.info("No temperature sensor configured, skipping climate entity")
         return
     
-    hub = hass.data[DOMAIN][config_entry.entry_id]["pentair_cloud_hub"]
-    devices: list[PentairDevice] = await hass.async_add_executor_job(hub.get_devices)
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    hub = entry_data["hub"]
+    coordinator = entry_data["coordinator"]
+    devices: list[PentairDevice] = entry_data["devices"]
     
     # Get heater program from config
-    heater_program = config_entry.data.get("relay_heater", 6)
+    heater_program = config_entry.data.get("relay_heater", RELAY_PROGRAM_HEATER)
+    medium_speed_program = config_entry.data.get("speed_medium", 2)
     
     # Get pump fan entity reference if it exists
-    pump_fan = hass.data[DOMAIN][config_entry.entry_id].get("pump_fan")
+    pump_fan = entry_data.get("pump_fan")
     
     entities = []
     
@@ -59,16 +84,18 @@ async def async_setup_entry(
                 hub, 
                 device, 
                 heater_program,
+                medium_speed_program,
                 temperature_sensor,
+                coordinator,
                 pump_fan
             )
         )
     
     _LOGGER.info(f"Setting up {len(entities)} climate entities")
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
 
 
-class PentairPoolHeater(ClimateEntity, RestoreEntity):
+class PentairPoolHeater(CoordinatorEntity, ClimateEntity, RestoreEntity):
     """Representation of a Pentair pool heater."""
     
     _attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
@@ -84,26 +111,42 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
         hub: PentairCloudHub,
         device: PentairDevice,
         heater_program: int,
+        medium_speed_program: int,
         temperature_sensor: str,
+        coordinator,
         pump_fan=None,
     ) -> None:
         """Initialize the pool heater."""
+        super().__init__(coordinator)
         self._logger = logger
         self._hub = hub
         self._device = device
         self._heater_program = heater_program
+        self._medium_speed_program = medium_speed_program
         self._temperature_sensor = temperature_sensor
         self._pump_fan = pump_fan  # Reference to pump fan entity for safety integration
         
         self._attr_name = f"{device.nickname} Pool Heater"
         self._attr_unique_id = f"pentair_{device.pentair_device_id}_pool_heater"
+        self._attr_device_info = device.device_info
         
         self._hvac_mode = HVACMode.OFF
-        self._target_temperature = 82.0
+        self._target_temperature: int | float = 82
         self._current_temperature = None
         self._is_heating = False
         self._heater_on = False
         
+        # Inputs of the last heater action, used to ignore sensor jitter
+        self._last_decision_mode: HVACMode | None = None
+        self._last_decision_temp: float | None = None
+        
+        # Serializes heater control across sensor, UI and debounce callers
+        self._control_lock = asyncio.Lock()
+        
+        # Debounce tracking for UI-driven setpoint/mode changes
+        self._debounce_unsub: CALLBACK_TYPE | None = None
+        self._debounce_delay = 0.5
+        
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
         await super().async_added_to_hass()
@@ -113,7 +156,10 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
             if last_state.state in [HVACMode.OFF, HVACMode.HEAT]:
                 self._hvac_mode = last_state.state
             if (target_temp := last_state.attributes.get(ATTR_TEMPERATURE)) is not None:
-                self._target_temperature = float(target_temp)
+                self._target_temperature = _normalize_setpoint(target_temp)
+        
+        # Pick up the heater program state from the latest refresh
+        self._update_heater_state()
         
         # Track temperature sensor changes
         self.async_on_remove(
@@ -125,16 +171,66 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
         )
         
         # Get initial temperature
-        await self._async_update_temperature()
+        self._update_temperature()
+    
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending debounced heater control."""
+        self._cancel_pending_control()
+        await super().async_will_remove_from_hass()
+    
+    @callback
+    def _schedule_control(self) -> None:
+        """Schedule heater control, restarting the delay on every UI change."""
+        self._cancel_pending_control()
+        self._debounce_unsub = async_call_later(
+            self.hass, self._debounce_delay, self._fire_control
+        )
+    
+    @callback
+    def _cancel_pending_control(self) -> None:
+        """Cancel a debounced heater control that has not fired yet."""
+        if self._debounce_unsub is not None:
+            self._debounce_unsub()
+            self._debounce_unsub = None
+    
+    @callback
+    def _fire_control(self, _now: datetime) -> None:
+        """Run heater control once the UI has settled."""
+        self._debounce_unsub = None
+        # Later UI changes only restart the delay, never abort a running control
+        self.hass.async_create_task(
+            self._async_run_control(), "pentair_heater_control"
+        )
+    
+    async def _async_run_control(self) -> None:
+        """Apply the settled mode and setpoint to the heater."""
+        await self._async_control_heater()
+        self.async_write_ha_state()
     
     @callback
     async def _async_temperature_changed(self, event) -> None:
         """Handle temperature sensor changes."""
-        await self._async_update_temperature()
+        new_state = event.data.get("new_state")
+        if new_state is None or new_state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        try:
+            new_temperature = float(new_state.state)
+        except (ValueError, TypeError):
+            return
+        
+        # Ignore attribute-only updates where the reading did not change
+        if (
+            self._current_temperature is not None
+            and abs(new_temperature - self._current_temperature) < 1e-3
+        ):
+            return
+        
+        self._update_temperature()
         await self._async_control_heater()
         self.async_write_ha_state()
     
-    async def _async_update_temperature(self) -> None:
+    @callback
+    def _update_temperature(self) -> None:
         """Update current temperature from sensor."""
         if state := self.hass.states.get(self._temperature_sensor):
             try:
@@ -142,81 +238,107 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
             except (ValueError, TypeError):
                 self._current_temperature = None
     
+    def _heater_matches_band(self) -> bool:
+        """Return True if the heater state already matches the hysteresis band."""
+        if self._hvac_mode == HVACMode.OFF:
+            return not self._heater_on
+        if self._current_temperature < (self._target_temperature - 1):
+            return self._heater_on
+        if self._current_temperature > self._target_temperature:
+            return not self._heater_on
+        return True
+    
+    @callback
+    def _record_decision(self) -> None:
+        """Remember the inputs of the last heater action."""
+        self._last_decision_mode = self._hvac_mode
+        self._last_decision_temp = self._current_temperature
+    
     async def _async_control_heater(self) -> None:
         """Control heater based on mode and temperature."""
-        if self._hvac_mode == HVACMode.OFF:
-            # Turn off heater
-            if self._heater_on:
-                await self._async_turn_off_heater()
-        elif self._hvac_mode == HVACMode.HEAT:
-            if self._current_temperature is None:
+        # Serialize control so overlapping events can't double-issue commands
+        async with self._control_lock:
+            # Skip sensor jitter that cannot change the outcome
+            if (
+                self._hvac_mode == self._last_decision_mode
+                and self._current_temperature is not None
+                and self._last_decision_temp is not None
+                and abs(self._current_temperature - self._last_decision_temp) < 0.25
+                and self._heater_matches_band()
+            ):
                 return
-                
-            # Simple thermostat logic with 1°F hysteresis
-            if self._current_temperature < (self._target_temperature - 1):
-                # Turn on heater
-                if not self._heater_on:
-                    await self._async_turn_on_heater()
-            elif self._current_temperature > self._target_temperature:
+        
+            if self._hvac_mode == HVACMode.OFF:
                 # Turn off heater
                 if self._heater_on:
                     await self._async_turn_off_heater()
+                    self._record_decision()
+            elif self._hvac_mode == HVACMode.HEAT:
+                if self._current_temperature is None:
+                    return
+                
+                # Simple thermostat logic with 1°F hysteresis
+                if self._current_temperature < (self._target_temperature - 1):
+                    # Turn on heater
+                    if not self._heater_on:
+                        await self._async_turn_on_heater()
+                        self._record_decision()
+                elif self._current_temperature > self._target_temperature:
+                    # Turn off heater
+                    if self._heater_on:
+                        await self._async_turn_off_heater()
+                        self._record_decision()
     
     async def _async_turn_on_heater(self) -> None:
         """Turn on the pool heater."""
-        # Notify pump fan that heater is turning on
         if self._pump_fan:
-            self._pump_fan.update_heater_state(True)
-            
             # Ensure pump is running at minimum 50% speed
-            if not self._pump_fan.is_on or self._pump_fan.percentage < 50:
-                if DEBUG_INFO:
-                    self._logger.info(
-                        f"Heater requested - ensuring pump runs at minimum 50% (current: {self._pump_fan.percentage}%)"
-                    )
-                # Turn on pump at 50% minimum speed for heater
-                await self._pump_fan.async_set_percentage(50)
-                # Wait for pump to start
-                await asyncio.sleep(2)
+            start_pump = not self._pump_fan.is_on or self._pump_fan.percentage < 50
+            if start_pump and DEBUG_INFO:
+                self._logger.info(
+                    f"Heater requested - ensuring pump runs at minimum 50% (current: {self._pump_fan.percentage}%)"
+                )
         else:
             # Fallback to old behavior if no pump fan entity
-            if not self._device.pump_running:
-                if DEBUG_INFO:
-                    self._logger.info(
-                        "Heater requested but pump is off - starting pump at medium speed"
-                    )
-                
-                # Get medium speed program from config
-                config_entry = self.hass.config_entries.async_get_entry(
-                    list(self.hass.data[DOMAIN].keys())[0]
-                )
-                medium_speed_program = config_entry.data.get("speed_medium", 2)
-                
-                # Turn on pump at medium speed
-                await self.hass.async_add_executor_job(
-                    self._hub.activate_program_concurrent,
-                    self._device.pentair_device_id,
-                    medium_speed_program
+            start_pump = not self._device.pump_running
+            if start_pump and DEBUG_INFO:
+                self._logger.info(
+                    "Heater requested but pump is off - starting pump at medium speed"
                 )
-                
-                # Wait a moment for pump to start
-                await asyncio.sleep(2)
-            
-        # Turn on heater program
-        await self.hass.async_add_executor_job(
-            self._hub.activate_program_concurrent,
-            self._device.pentair_device_id,
-            self._heater_program
-        )
+        
+        if start_pump:
+            # Start pump, wait for it and start heater in one executor job
+            await self._hub.async_run(
+                self._hub.start_pump_and_program,
+                self._device.pentair_device_id,
+                self._medium_speed_program,
+                self._heater_program
+            )
+            # Let the pump entity pick up the new speed without commanding it
+            async_dispatcher_send(
+                self.hass,
+                SIGNAL_PUMP_SPEED_CHANGED.format(self._device.pentair_device_id),
+            )
+        else:
+            # Turn on heater program
+            await self._hub.async_run(
+                self._hub.activate_program_concurrent,
+                self._device.pentair_device_id,
+                self._heater_program
+            )
         self._heater_on = True
         self._is_heating = True
         
+        # Notify pump fan once its speed reflects the started pump
+        if self._pump_fan:
+            self._pump_fan.update_heater_state(True)
+        
         if DEBUG_INFO:
             self._logger.info(f"Pool heater turned ON")
     
     async def _async_turn_off_heater(self) -> None:
         """Turn off the pool heater."""
-        await self.hass.async_add_executor_job(
+        await self._hub.async_run(
             self._hub.deactivate_program,
             self._device.pentair_device_id,
             self._heater_program
@@ -231,19 +353,6 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
         if DEBUG_INFO:
             self._logger.info(f"Pool heater turned OFF")
     
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {
-                (DOMAIN, f"pentair_{self._device.pentair_device_id}")
-            },
-            "name": self._device.nickname,
-            "model": self._device.nickname,
-            "sw_version": "1.0",
-            "manufacturer": "Pentair",
-        }
-    
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
@@ -269,23 +378,34 @@ class PentairPoolHeater(ClimateEntity, RestoreEntity):
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is not None:
-            self._target_temperature = temperature
-            await self._async_control_heater()
+            self._target_temperature = _normalize_setpoint(temperature)
+            # Update UI immediately, defer the cloud call until input settles
             self.async_write_ha_state()
+            self._schedule_control()
     
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new operation mode."""
         self._hvac_mode = hvac_mode
-        await self._async_control_heater()
+        # Update UI immediately, defer the cloud call until input settles
         self.async_write_ha_state()
+        self._schedule_control()
     
-    def update(self) -> None:
-        """Update heater state."""
-        self._hub.update_pentair_devices_status()
+    @callback
+    def _update_heater_state(self) -> None:
+        """Update heater state from the coordinator snapshot."""
+        device_data = (self.coordinator.data or {}).get(self._device.pentair_device_id)
+        if device_data is None:
+            return
+        program = device_data["programs"].get(self._heater_program)
+        if program is None:
+            return
         
         # Check if heater program is active
-        for program in self._device.programs:
-            if program.id == self._heater_program:
-                self._heater_on = program.running
-                self._is_heating = program.running and self._hvac_mode == HVACMode.HEAT
-                break
\ No newline at end of file
+        self._heater_on = program.running
+        self._is_heating = program.running and self._hvac_mode == HVACMode.HEAT
+    
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from coordinator."""
+        self._update_heater_state()
+        self.async_write_ha_state()
@@ -13,7 +13,7 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import DOMAIN, RELAY_PROGRAM_HEATER, RELAY_PROGRAM_LIGHTS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,6 +37,68 @@ DEFAULT_PROGRAMS_SCHEMA = vol.Schema(
     }
 )
 
+# Program mapping keys shared by the config and options flows, with the
+# program ID used when a selection cannot be resolved
+_PROGRAM_KEYS = (
+    "speed_low",
+    "speed_medium",
+    "speed_high",
+    "speed_max",
+    "relay_lights",
+    "relay_heater",
+)
+_PROGRAM_DEFAULT_IDS = {
+    "speed_low": 3,
+    "speed_medium": 2,
+    "speed_high": 4,
+    "speed_max": 1,
+    "relay_lights": RELAY_PROGRAM_LIGHTS,
+    "relay_heater": RELAY_PROGRAM_HEATER,
+}
+
+_TEMPERATURE_SENSOR_SELECTOR = selector.EntitySelector(
+    selector.EntitySelectorConfig(
+        domain="sensor",
+        device_class="temperature"
+    )
+)
+
+
+def _make_schema(
+    program_names: list[str],
+    defaults: dict[str, str],
+    temp_default: Any = vol.UNDEFINED,
+) -> vol.Schema:
+    """Build the program mapping schema for the given program names and defaults."""
+    program_in = vol.In(program_names)
+    fields = {
+        vol.Required(key, default=defaults[key]): program_in for key in _PROGRAM_KEYS
+    }
+    fields[vol.Optional("temperature_sensor", default=temp_default)] = (
+        _TEMPERATURE_SENSOR_SELECTOR
+    )
+    return vol.Schema(fields)
+
+
+def _map_program_names(program_map: dict[str, int], user_input: dict[str, Any]) -> dict[str, int]:
+    """Convert selected program names back to program IDs."""
+    return {
+        key: program_map.get(user_input[key], _PROGRAM_DEFAULT_IDS[key])
+        for key in _PROGRAM_KEYS
+    }
+
+
+def _index_manual_programs(device) -> tuple[dict[str, int], dict[int, str], list[str]]:
+    """Index a device's manual programs (type 2) by name and by ID in one pass."""
+    program_map, reverse_map, program_names = {}, {}, []
+    for program in device.programs:
+        if program.program_type != 2:
+            continue
+        program_map[program.name] = program.id
+        reverse_map[program.id] = program.name
+        program_names.append(program.name)
+    return program_map, reverse_map, program_names
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
@@ -55,9 +117,16 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     # )
 
     hub = PentairCloudHub(_LOGGER)
-    if not await hass.async_add_executor_job(
-        hub.authenticate, data["username"], data["password"]
-    ):
+    authenticated = False
+    try:
+        authenticated = await hass.async_add_executor_job(
+            hub.authenticate, data["username"], data["password"]
+        )
+    finally:
+        # Only an authenticated hub is handed to the caller, who shuts it down
+        if not authenticated:
+            await hass.async_add_executor_job(hub.shutdown)
+    if not authenticated:
         raise InvalidAuth
 
     # If you cannot connect:
@@ -65,8 +134,16 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     # If the authentication is wrong:
     # InvalidAuth
 
-    # Return info that you want to store in the config entry.
-    return {"title": "PentairCloud"}
+    # Return info that you want to store in the config entry, plus the
+    # authenticated hub so callers don't need to log in again. The caller
+    # owns the hub and must call shutdown() when done with it.
+    return {"title": "PentairCloud", "hub": hub}
+
+
+def _bootstrap(hub) -> list:
+    """Populate AWS credentials and devices for an authenticated hub."""
+    hub.populate_AWS_and_data_fields()
+    return hub.get_devices()
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -77,7 +154,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         """Initialize the config flow."""
         self._data = {}
-        self._hub = None
         self._devices = []
 
     async def async_step_user(
@@ -93,15 +169,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         try:
             info = await validate_input(self.hass, user_input)
-            # Store credentials and hub for next step
+            hub = info["hub"]
+            try:
+                self._devices = await self.hass.async_add_executor_job(_bootstrap, hub)
+            finally:
+                # The entry sets up its own hub, this one only lists devices
+                await self.hass.async_add_executor_job(hub.shutdown)
+            # Store credentials for next step
             self._data = user_input
-            from .pentaircloud_modified import PentairCloudHub
-            self._hub = PentairCloudHub(_LOGGER)
-            await self.hass.async_add_executor_job(
-                self._hub.authenticate, user_input["username"], user_input["password"]
-            )
-            await self.hass.async_add_executor_job(self._hub.populate_AWS_and_data_fields)
-            self._devices = await self.hass.async_add_executor_job(self._hub.get_devices)
             # Move to program mapping configuration
             return await self.async_step_programs()
         except CannotConnect:
@@ -122,15 +197,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle program mapping configuration."""
         if user_input is not None:
             # Convert program names to IDs
-            program_map = self._get_program_map()
-            mapped_data = {
-                "speed_low": program_map.get(user_input["speed_low"], 3),
-                "speed_medium": program_map.get(user_input["speed_medium"], 2),
-                "speed_high": program_map.get(user_input["speed_high"], 4),
-                "speed_max": program_map.get(user_input["speed_max"], 1),
-                "relay_lights": program_map.get(user_input["relay_lights"], 5),
-                "relay_heater": program_map.get(user_input["relay_heater"], 6),
-            }
+            mapped_data = _map_program_names(self._get_program_map(), user_input)
             # Add temperature sensor if selected
             if user_input.get("temperature_sensor"):
                 mapped_data["temperature_sensor"] = user_input["temperature_sensor"]
@@ -151,13 +218,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     
     def _get_program_map(self) -> dict[str, int]:
         """Get mapping of program names to IDs (manual programs only)."""
-        program_map = {}
-        if self._devices:
-            device = self._devices[0]
-            for program in device.programs:
-                # Only include manual programs (type 2)
-                if program.program_type == 2:
-                    program_map[program.name] = program.id
+        if not self._devices:
+            return {}
+        program_map, _, _ = _index_manual_programs(self._devices[0])
         return program_map
     
     def _build_programs_schema(self) -> vol.Schema:
@@ -165,28 +228,26 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if not self._devices:
             return DEFAULT_PROGRAMS_SCHEMA
             
-        device = self._devices[0]
         # Only include manual programs (type 2)
-        program_names = [p.name for p in device.programs if p.program_type == 2]
+        _, _, program_names = _index_manual_programs(self._devices[0])
         
         if not program_names:
             return DEFAULT_PROGRAMS_SCHEMA
             
-        return vol.Schema(
+        # Default to the first manual programs in slot order where available
+        def pick(index: int) -> str:
+            return program_names[index] if len(program_names) > index else program_names[0]
+        
+        return _make_schema(
+            program_names,
             {
-                vol.Required("speed_low", default=program_names[2] if len(program_names) > 2 else program_names[0]): vol.In(program_names),
-                vol.Required("speed_medium", default=program_names[1] if len(program_names) > 1 else program_names[0]): vol.In(program_names),
-                vol.Required("speed_high", default=program_names[3] if len(program_names) > 3 else program_names[0]): vol.In(program_names),
-                vol.Required("speed_max", default=program_names[0]): vol.In(program_names),
-                vol.Required("relay_lights", default=program_names[4] if len(program_names) > 4 else program_names[0]): vol.In(program_names),
-                vol.Required("relay_heater", default=program_names[5] if len(program_names) > 5 else program_names[0]): vol.In(program_names),
-                vol.Optional("temperature_sensor"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain="sensor",
-                        device_class="temperature"
-                    )
-                ),
-            }
+                "speed_low": pick(2),
+                "speed_medium": pick(1),
+                "speed_high": pick(3),
+                "speed_max": pick(0),
+                "relay_lights": pick(4),
+                "relay_heater": pick(5),
+            },
         )
 
     @staticmethod
@@ -203,6 +264,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         """Initialize options flow."""
         # Don't store config_entry - access it via self.config_entry property
         self._program_map = {}
+        self._devices = None
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -210,14 +272,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         """Manage the options."""
         if user_input is not None:
             # Convert program names back to IDs
-            mapped_data = {
-                "speed_low": self._program_map.get(user_input["speed_low"], 3),
-                "speed_medium": self._program_map.get(user_input["speed_medium"], 2),
-                "speed_high": self._program_map.get(user_input["speed_high"], 4),
-                "speed_max": self._program_map.get(user_input["speed_max"], 1),
-                "relay_lights": self._program_map.get(user_input["relay_lights"], 5),
-                "relay_heater": self._program_map.get(user_input["relay_heater"], 6),
-            }
+            mapped_data = _map_program_names(self._program_map, user_input)
             # Add temperature sensor if selected
             if "temperature_sensor" in user_input:
                 mapped_data["temperature_sensor"] = user_input["temperature_sensor"]
@@ -230,65 +285,48 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             return self.async_create_entry(title="", data={})
 
         # Get hub and devices to show program names
-        from .pentaircloud_modified import PentairCloudHub
-        hub = PentairCloudHub(_LOGGER)
-        await self.hass.async_add_executor_job(
-            hub.authenticate, 
-            self.config_entry.data["username"], 
-            self.config_entry.data["password"]
-        )
-        await self.hass.async_add_executor_job(hub.populate_AWS_and_data_fields)
-        devices = await self.hass.async_add_executor_job(hub.get_devices)
+        if self._devices is None:
+            # Prefer the already-authenticated hub of the running integration
+            hub = (
+                self.hass.data.get(DOMAIN, {})
+                .get(self.config_entry.entry_id, {})
+                .get("hub")
+            )
+            if hub is None:
+                from .pentaircloud_modified import PentairCloudHub
+                hub = PentairCloudHub(_LOGGER)
+                try:
+                    await self.hass.async_add_executor_job(
+                        hub.authenticate, 
+                        self.config_entry.data["username"], 
+                        self.config_entry.data["password"]
+                    )
+                    self._devices = await self.hass.async_add_executor_job(
+                        _bootstrap, hub
+                    )
+                finally:
+                    # Only needed to list the programs, never handed to the entry
+                    await self.hass.async_add_executor_job(hub.shutdown)
+            else:
+                self._devices = hub.get_devices()
+        devices = self._devices
         
         if not devices:
             return self.async_abort(reason="no_devices")
             
-        device = devices[0]
-        # Only include manual programs (type 2)
-        manual_programs = [p for p in device.programs if p.program_type == 2]
-        program_names = [p.name for p in manual_programs]
-        program_map = {p.name: p.id for p in manual_programs}
-        
-        # Reverse map current IDs to names
+        # Only include manual programs (type 2), with current IDs mapped back to names
+        program_map, reverse_map, program_names = _index_manual_programs(devices[0])
         current_data = self.config_entry.data
-        reverse_map = {v: k for k, v in program_map.items()}
         
-        schema = vol.Schema(
+        schema = _make_schema(
+            program_names,
             {
-                vol.Required(
-                    "speed_low", 
-                    default=reverse_map.get(current_data.get("speed_low", 3), program_names[0])
-                ): vol.In(program_names),
-                vol.Required(
-                    "speed_medium", 
-                    default=reverse_map.get(current_data.get("speed_medium", 2), program_names[0])
-                ): vol.In(program_names),
-                vol.Required(
-                    "speed_high", 
-                    default=reverse_map.get(current_data.get("speed_high", 4), program_names[0])
-                ): vol.In(program_names),
-                vol.Required(
-                    "speed_max", 
-                    default=reverse_map.get(current_data.get("speed_max", 1), program_names[0])
-                ): vol.In(program_names),
-                vol.Required(
-                    "relay_lights", 
-                    default=reverse_map.get(current_data.get("relay_lights", 5), program_names[0])
-                ): vol.In(program_names),
-                vol.Required(
-                    "relay_heater", 
-                    default=reverse_map.get(current_data.get("relay_heater", 6), program_names[0])
-                ): vol.In(program_names),
-                vol.Optional(
-                    "temperature_sensor",
-                    default=current_data.get("temperature_sensor")
-                ): selector.EntitySelector(
-                    selector.EntitySelectorConfig(
-                        domain="sensor",
-                        device_class="temperature"
-                    )
-                ),
-            }
+                key: reverse_map.get(
+                    current_data.get(key, _PROGRAM_DEFAULT_IDS[key]), program_names[0]
+                )
+                for key in _PROGRAM_KEYS
+            },
+            temp_default=current_data.get("temperature_sensor"),
         )
         
         # Store program map for conversion
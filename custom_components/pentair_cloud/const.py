@@ -2,3 +2,10 @@
 
 DOMAIN = "pentair_cloud"
 DEBUG_INFO = True
+
+# Default relay program IDs, used when the config entry has no mapping
+RELAY_PROGRAM_LIGHTS = 5
+RELAY_PROGRAM_HEATER = 6
+
+# Dispatcher signal sent when a pump program was changed outside the fan entity
+SIGNAL_PUMP_SPEED_CHANGED = f"{DOMAIN}_pump_speed_changed_{{}}"
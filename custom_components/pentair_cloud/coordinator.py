@@ -1,5 +1,7 @@
 """Data update coordinator for Pentair Cloud integration."""
 import logging
+import time
+from dataclasses import dataclass
 from datetime import timedelta
 from typing import Any, Dict, Optional
 
@@ -13,6 +15,19 @@ _LOGGER = logging.getLogger(__name__)
 
 # How often to poll the Pentair API for updates
 SCAN_INTERVAL = timedelta(seconds=30)
+# Faster polling right after a command, until the device has settled
+FAST_SCAN_INTERVAL = timedelta(seconds=5)
+FAST_SCAN_DURATION_SECONDS = 60
+
+
+@dataclass(slots=True, frozen=True)
+class ProgramSnapshot:
+    """Immutable view of a program's state at the time of a refresh."""
+
+    running: bool
+    control_value: Any
+    name: str
+    program_type: int
 
 
 class PentairDataUpdateCoordinator(DataUpdateCoordinator):
@@ -31,14 +46,35 @@ class PentairDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=SCAN_INTERVAL,
         )
         self.hub = hub
+        self._seen_revision: Optional[int] = None
+        self._fast_scan_until: Optional[float] = None
+
+    def async_boost_polling(self) -> None:
+        """Poll at the fast interval for a while after a user command."""
+        self._fast_scan_until = time.monotonic() + FAST_SCAN_DURATION_SECONDS
+        self.update_interval = FAST_SCAN_INTERVAL
 
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from Pentair API."""
+        # Drop back to the normal interval once the fast window has passed
+        if (
+            self._fast_scan_until is not None
+            and time.monotonic() >= self._fast_scan_until
+        ):
+            self._fast_scan_until = None
+            self.update_interval = SCAN_INTERVAL
+        
         try:
-            # Update device status from the API
-            await self.hass.async_add_executor_job(
-                self.hub.update_pentair_devices_status
-            )
+            # Update device status from the API. The hub requests every
+            # device's fields in a single POST, so there is nothing to fan
+            # out per device here. Boosted polls bypass the hub's minimum
+            # refresh interval, which is longer than FAST_SCAN_INTERVAL.
+            await self.hub.async_refresh(force=self._fast_scan_until is not None)
+            
+            # Nothing changed since the last snapshot, hand it back untouched
+            revision = self.hub.last_revision
+            if self.data is not None and revision == self._seen_revision:
+                return self.data
             
             # Return device data
             devices = self.hub.get_devices()
@@ -46,17 +82,15 @@ class PentairDataUpdateCoordinator(DataUpdateCoordinator):
             for device in devices:
                 data[device.pentair_device_id] = {
                     "programs": {
-                        p.id: {
-                            "running": p.running,
-                            "control_value": p.control_value,
-                            "name": p.name,
-                            "program_type": p.program_type,
-                        }
+                        p.id: ProgramSnapshot(
+                            p.running, p.control_value, p.name, p.program_type
+                        )
                         for p in device.programs
                     },
                     "nickname": device.nickname,
                 }
             
+            self._seen_revision = revision
             _LOGGER.debug(f"Updated Pentair data for {len(devices)} devices")
             return data
             
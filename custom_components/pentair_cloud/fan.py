@@ -1,25 +1,31 @@
 """Fan platform for Pentair pump control with heater safety."""
 import logging
-from typing import Any, Optional, List
+from typing import Any, Optional
 from datetime import datetime, timedelta
-import asyncio
-import time
 
 from homeassistant.components.fan import (
     FanEntity,
     FanEntityFeature,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.persistent_notification import (
+    async_create as async_pn_create,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN, DEBUG_INFO
-from .pentaircloud import PentairCloudHub, PentairDevice, PentairPumpProgram
+from .const import DOMAIN, DEBUG_INFO, SIGNAL_PUMP_SPEED_CHANGED
+from .pentaircloud_modified import PentairCloudHub, PentairDevice, PentairPumpProgram
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delay before a slider-driven speed change is sent to the cloud
+SPEED_CHANGE_DEBOUNCE_SECONDS = 0.5
+
 PRESET_MODES = {
     "off": 0,
     "low": 30,
@@ -27,6 +33,8 @@ PRESET_MODES = {
     "high": 75,
     "max": 100
 }
+_PRESET_NAMES: tuple[str, ...] = tuple(PRESET_MODES)
+_SPEED_TO_PRESET = {speed: preset for preset, speed in PRESET_MODES.items()}
 
 # Note: Actual program mappings come from config_entry.data
 # The old hardcoded SPEED_TO_PROGRAM and PROGRAM_TO_SPEED have been removed
@@ -38,9 +46,9 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Pentair pump fan entities."""
-    # Try both keys for compatibility
-    hub = hass.data[DOMAIN][config_entry.entry_id].get("hub") or hass.data[DOMAIN][config_entry.entry_id].get("pentair_cloud_hub")
-    coordinator = hass.data[DOMAIN][config_entry.entry_id].get("coordinator")
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    hub = entry_data["hub"]
+    coordinator = entry_data["coordinator"]
     
     # Get the program mappings from config
     program_mappings = {
@@ -50,25 +58,38 @@ async def async_setup_entry(
         "max": config_entry.data.get("speed_max", 1),
     }
     
-    _LOGGER.info(f"Using program mappings from config: {program_mappings}")
+    _LOGGER.info("Using program mappings from config: %s", program_mappings)
     
     entities = []
-    for device in hub.get_devices():
+    for device in entry_data["devices"]:
         # Create fan entity for each pump device with config mappings
         fan_entity = PentairPumpFan(hub, device, coordinator, hass, program_mappings)
         entities.append(fan_entity)
-        
-        # Store reference for heater integration
-        hass.data[DOMAIN][config_entry.entry_id]["pump_fan"] = fan_entity
-        
-        _LOGGER.info(f"Created pump fan entity for {device.nickname}")
-    
-    async_add_entities(entities, True)
+        _LOGGER.info("Created pump fan entity for %s", device.nickname)
+
+    # Store reference for heater integration
+    if entities:
+        entry_data["pump_fan"] = entities[-1]
+
+    # The coordinator has already done its first refresh during setup
+    async_add_entities(entities)
 
 
 class PentairPumpFan(CoordinatorEntity, FanEntity):
     """Pentair pump fan entity with heater safety."""
     
+    __slots__ = (
+        "_hub",
+        "_device",
+        "_program_mappings",
+        "_program_to_speed",
+        "_program_to_preset",
+        "_pending_speed_change",
+        "_debounce_unsub",
+        "_heater_on",
+        "_minimum_speed_override",
+    )
+    
     def __init__(self, hub: PentairCloudHub, device: PentairDevice, coordinator, hass: HomeAssistant, program_mappings: dict):
         """Initialize the fan."""
         super().__init__(coordinator)
@@ -78,6 +99,16 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         self._program_mappings = program_mappings  # Store the actual program mappings from config
         self._attr_unique_id = f"pentair_pump_{device.pentair_device_id}"
         self._attr_name = f"{device.nickname} Pump"
+        self._attr_device_info = device.device_info
+        self._attr_preset_modes = _PRESET_NAMES
+        self._attr_speed_count = 4  # Low, Medium, High, Max
+        # As of HA 2024.8, TURN_ON and TURN_OFF must be explicitly declared
+        self._attr_supported_features = (
+            FanEntityFeature.TURN_ON
+            | FanEntityFeature.TURN_OFF
+            | FanEntityFeature.PRESET_MODE
+            | FanEntityFeature.SET_SPEED
+        )
         
         # Create reverse mapping for state updates
         self._program_to_speed = {
@@ -87,18 +118,22 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
             program_mappings["max"]: 100,
         }
         
-        _LOGGER.info(f"Fan entity initialized with program mappings: {self._program_mappings}")
-        _LOGGER.info(f"Program to speed mapping: {self._program_to_speed}")
+        self._program_to_preset = {
+            program_mappings[preset]: preset for preset in _PRESET_NAMES[1:]
+        }
+        
+        _LOGGER.info("Fan entity initialized with program mappings: %s", self._program_mappings)
+        _LOGGER.info("Program to speed mapping: %s", self._program_to_speed)
         
         # State tracking
         self._attr_is_on = False
+        self._attr_icon = "mdi:pump-off"
         self._attr_percentage = 0
         self._attr_preset_mode = "off"
         
         # Debounce tracking
         self._pending_speed_change = None
-        self._last_speed_change = time.time()
-        self._speed_change_task = None
+        self._debounce_unsub: CALLBACK_TYPE | None = None
         
         # Heater safety tracking
         self._heater_on = False
@@ -107,98 +142,55 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         # Update state from device
         self._update_state_from_device()
     
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return self._attr_unique_id
-    
-    @property
-    def name(self) -> str:
-        """Return the name of the fan."""
-        return self._attr_name
-    
-    @property
-    def is_on(self) -> bool:
-        """Return true if the fan is on."""
-        return self._attr_is_on
-    
-    @property
-    def icon(self) -> str:
-        """Return the icon to use in the frontend."""
-        if self._attr_is_on:
-            return "mdi:pump"
-        return "mdi:pump-off"
-    
-    @property
-    def percentage(self) -> Optional[int]:
-        """Return current speed percentage (0-100)."""
-        return self._attr_percentage
-    
-    @property
-    def speed_count(self) -> int:
-        """Return number of speeds."""
-        return 4  # Low, Medium, High, Max
-    
-    @property
-    def preset_modes(self) -> List[str]:
-        """Return available preset modes."""
-        return list(PRESET_MODES.keys())
-    
-    @property
-    def preset_mode(self) -> Optional[str]:
-        """Return current preset mode."""
-        return self._attr_preset_mode
-    
-    @property
-    def supported_features(self) -> int:
-        """Return supported features."""
-        # As of HA 2024.8, TURN_ON and TURN_OFF must be explicitly declared
-        return (
-            FanEntityFeature.TURN_ON
-            | FanEntityFeature.TURN_OFF
-            | FanEntityFeature.PRESET_MODE 
-            | FanEntityFeature.SET_SPEED
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to pump changes made by other entities."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_pending_speed_change)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_PUMP_SPEED_CHANGED.format(self._device.pentair_device_id),
+                self._handle_pump_speed_changed,
+            )
         )
     
-    @property
-    def device_info(self):
-        """Return device info to associate with the Pool Pump device."""
-        return {
-            "identifiers": {
-                (DOMAIN, f"pentair_{self._device.pentair_device_id}")
-            },
-            "name": self._device.nickname,
-            "model": self._device.nickname,
-            "sw_version": "1.0",
-            "manufacturer": "Pentair",
-        }
+    @callback
+    def _set_on(self, is_on: bool) -> None:
+        """Set the on state and the matching icon."""
+        self._attr_is_on = is_on
+        self._attr_icon = "mdi:pump" if is_on else "mdi:pump-off"
     
     def _check_heater_safety(self, requested_speed: int) -> int:
         """
         Enforce heater safety rules.
         Returns adjusted speed if heater requires minimum flow.
         """
-        if self._heater_on:
-            if requested_speed < 50 and requested_speed > 0:
-                _LOGGER.warning(
-                    f"Heater is ON - enforcing minimum 50% pump speed for safety (requested: {requested_speed}%)"
-                )
-                self._minimum_speed_override = True
-                return 50  # Force minimum 50% when heater is on
-            elif requested_speed == 0:
-                _LOGGER.error(
-                    "SAFETY: Cannot turn off pump while heater is running! "
-                    "Please turn off heater first."
-                )
-                # Return current speed to prevent shutdown
-                return self._attr_percentage if self._attr_percentage > 0 else 50
+        if not self._heater_on:
+            if self._minimum_speed_override:
+                self._minimum_speed_override = False
+            return requested_speed
+        
+        if 0 < requested_speed < 50:
+            _LOGGER.warning(
+                "Heater is ON - enforcing minimum 50%% pump speed for safety (requested: %s%%)",
+                requested_speed,
+            )
+            self._minimum_speed_override = True
+            return 50  # Force minimum 50% when heater is on
+        if requested_speed == 0:
+            _LOGGER.error(
+                "SAFETY: Cannot turn off pump while heater is running! "
+                "Please turn off heater first."
+            )
+            # Return current speed to prevent shutdown
+            return self._attr_percentage if self._attr_percentage > 0 else 50
         
         self._minimum_speed_override = False
         return requested_speed
     
     async def async_set_percentage(self, percentage: int) -> None:
         """Set pump speed with debouncing and heater safety."""
-        _LOGGER.info(f"Setting pump speed to {percentage}%")
+        _LOGGER.info("Setting pump speed to %s%%", percentage)
         
         # Ensure percentage is within valid range
         percentage = max(0, min(100, int(percentage)))
@@ -208,39 +200,40 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         
         if safe_speed != percentage:
             # Notify user if speed was adjusted for safety
-            await self._notify_safety_override(percentage, safe_speed)
+            self._notify_safety_override(percentage, safe_speed)
             if safe_speed == self._attr_percentage:
                 # Speed unchanged due to safety, don't proceed
                 return
         
         # Cancel any pending speed change
-        if self._speed_change_task and not self._speed_change_task.done():
-            self._speed_change_task.cancel()
+        self._cancel_pending_speed_change()
         
         # Store pending speed change
         self._pending_speed_change = safe_speed
-        self._last_speed_change = time.time()
         
-        # Create debounced task
-        self._speed_change_task = asyncio.create_task(
-            self._debounced_speed_change(safe_speed)
+        # Wait for slider to settle before touching the cloud
+        self._debounce_unsub = async_call_later(
+            self.hass, SPEED_CHANGE_DEBOUNCE_SECONDS, self._fire_speed_change
         )
     
-    async def _debounced_speed_change(self, speed: int) -> None:
-        """Execute speed change after debounce delay."""
-        try:
-            # Wait for slider to settle (reduced to 0.5 seconds for better responsiveness)
-            await asyncio.sleep(0.5)
-            
-            # Only execute if this is still the latest request
-            if self._pending_speed_change == speed:
-                await self._execute_speed_change(speed)
-        except asyncio.CancelledError:
-            _LOGGER.debug(f"Speed change to {speed}% was cancelled")
+    @callback
+    def _cancel_pending_speed_change(self) -> None:
+        """Cancel a debounced speed change that has not fired yet."""
+        if self._debounce_unsub is not None:
+            self._debounce_unsub()
+            self._debounce_unsub = None
+    
+    @callback
+    def _fire_speed_change(self, _now: datetime) -> None:
+        """Execute the latest requested speed once the debounce delay expires."""
+        self._debounce_unsub = None
+        self.hass.async_create_task(
+            self._execute_speed_change(self._pending_speed_change)
+        )
     
     async def _execute_speed_change(self, speed: int) -> None:
         """Execute the actual speed change."""
-        _LOGGER.info(f"Executing pump speed change to {speed}%")
+        _LOGGER.info("Executing pump speed change to %s%%", speed)
         
         try:
             # Map speed percentage to appropriate program using actual config mappings
@@ -260,64 +253,51 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
                 target_program_id = self._program_mappings["max"]
                 actual_speed = 100  # Actual speed is 100%
             
-            _LOGGER.info(f"Mapped {speed}% to program {target_program_id} with actual speed {actual_speed}%")
+            _LOGGER.info("Mapped %s%% to program %s with actual speed %s%%", speed, target_program_id, actual_speed)
+            
+            # Only stop pump programs (from our mapped programs), not relay
+            # programs, and never the target itself so it is not restarted
+            stop_ids = [
+                program_id
+                for program_id in self._program_to_speed
+                if program_id != target_program_id
+                and (program := self._device.programs_by_id.get(program_id)) is not None
+                and program.running
+            ]
             
-            # Only stop pump programs (from our mapped programs), not relay programs
-            for program in self._device.programs:
-                if program.running and program.id in self._program_to_speed:
-                    _LOGGER.debug(f"Stopping pump program {program.id} ({program.name})")
-                    success = await self.hass.async_add_executor_job(
-                        self._hub.stop_program,
-                        self._device.pentair_device_id,
-                        program.id
-                    )
-                    if not success:
-                        _LOGGER.error(f"Failed to stop program {program.id}")
-                    # Small delay between stop and start
-                    await asyncio.sleep(0.5)
+            # Stop, start and refresh in one executor job
+            success = await self._hub.async_run(
+                self._hub.apply_speed_program,
+                self._device.pentair_device_id,
+                stop_ids,
+                target_program_id
+            )
             
             if target_program_id is not None:
-                # Start the appropriate program
-                _LOGGER.info(f"Starting program {target_program_id} for {actual_speed}% speed")
-                success = await self.hass.async_add_executor_job(
-                    self._hub.start_program,
-                    self._device.pentair_device_id,
-                    target_program_id
-                )
-                
                 if success:
                     # Set the actual speed, not the requested speed
                     self._attr_percentage = actual_speed
-                    self._attr_is_on = True
-                    self._update_preset_mode(actual_speed)
-                    _LOGGER.info(f"Successfully set pump to {actual_speed}%")
+                    self._set_on(True)
+                    self._attr_preset_mode = _SPEED_TO_PRESET[actual_speed]
+                    _LOGGER.info("Successfully set pump to %s%%", actual_speed)
                 else:
-                    _LOGGER.error(f"Failed to start program {target_program_id}")
+                    _LOGGER.error("Failed to start program %s", target_program_id)
                     # Don't update state if command failed
                     return
             else:
                 # Speed is 0, pump is off
                 self._attr_percentage = 0
-                self._attr_is_on = False
+                self._set_on(False)
                 self._attr_preset_mode = "off"
                 _LOGGER.info("Pump turned off")
             
-            # Force immediate status update
-            await self.hass.async_add_executor_job(
-                self._hub.update_pentair_devices_status
-            )
-            
-            # Wait a moment for the status to propagate
-            await asyncio.sleep(1)
-            
-            # Re-read state from device to ensure accuracy
-            self._update_state_from_device()
-            
-            # Update HA state
+            # Update HA state and let the coordinator confirm it from the cloud
             self.async_write_ha_state()
+            self.coordinator.async_boost_polling()
+            await self.coordinator.async_request_refresh()
             
         except Exception as e:
-            _LOGGER.error(f"Error executing speed change: {e}")
+            _LOGGER.error("Error executing speed change: %s", e)
     
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set pump to preset mode."""
@@ -326,7 +306,7 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
     
     async def async_turn_on(self, percentage: Optional[int] = None, preset_mode: Optional[str] = None, **kwargs) -> None:
         """Turn on pump."""
-        _LOGGER.info(f"Turning on pump with percentage={percentage}, preset_mode={preset_mode}")
+        _LOGGER.info("Turning on pump with percentage=%s, preset_mode=%s", percentage, preset_mode)
         
         if preset_mode is not None:
             await self.async_set_preset_mode(preset_mode)
@@ -352,15 +332,12 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
             )
             
             # Create persistent notification
-            await self.hass.services.async_call(
-                "persistent_notification",
-                "create",
-                {
-                    "title": "Pool Pump Safety Alert",
-                    "message": "Cannot turn off pool pump while heater is active. "
-                               "Please turn off the heater first for safety.",
-                    "notification_id": "pentair_pump_safety_block"
-                }
+            async_pn_create(
+                self.hass,
+                "Cannot turn off pool pump while heater is active. "
+                "Please turn off the heater first for safety.",
+                title="Pool Pump Safety Alert",
+                notification_id="pentair_pump_safety_block",
             )
             
             raise HomeAssistantError(
@@ -370,51 +347,35 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         
         # Stop all pump programs directly
         try:
-            any_failed = False
-            for program in self._device.programs:
-                if program.running and program.id in self._program_to_speed:
-                    _LOGGER.debug(f"Stopping pump program {program.id}")
-                    success = await self.hass.async_add_executor_job(
-                        self._hub.stop_program,
-                        self._device.pentair_device_id,
-                        program.id
-                    )
-                    if not success:
-                        _LOGGER.error(f"Failed to stop pump program {program.id}")
-                        any_failed = True
+            stop_ids = [
+                program_id
+                for program_id in self._program_to_speed
+                if (program := self._device.programs_by_id.get(program_id)) is not None
+                and program.running
+            ]
+            _LOGGER.debug("Stopping pump programs %s", stop_ids)
+            success = await self._hub.async_run(
+                self._hub.deactivate_programs,
+                self._device.pentair_device_id,
+                stop_ids
+            )
             
-            if any_failed:
-                _LOGGER.error("Some programs failed to stop - pump may still be running")
+            if not success:
+                _LOGGER.error("Failed to stop pump programs %s - pump may still be running", stop_ids)
                 # Don't update state if we failed to stop
                 return
             
             # Update state only if all stops succeeded
             self._attr_percentage = 0
-            self._attr_is_on = False
+            self._set_on(False)
             self._attr_preset_mode = "off"
             
-            # Force status update
-            await self.hass.async_add_executor_job(
-                self._hub.update_pentair_devices_status
-            )
-            
             self.async_write_ha_state()
+            self.coordinator.async_boost_polling()
+            await self.coordinator.async_request_refresh()
             
         except Exception as e:
-            _LOGGER.error(f"Error turning off pump: {e}")
-    
-    def _update_preset_mode(self, speed: int) -> None:
-        """Update preset mode based on speed."""
-        if speed >= 100:
-            self._attr_preset_mode = "max"
-        elif speed >= 75:
-            self._attr_preset_mode = "high"
-        elif speed >= 50:
-            self._attr_preset_mode = "medium"
-        elif speed >= 30:
-            self._attr_preset_mode = "low"
-        else:
-            self._attr_preset_mode = "off"
+            _LOGGER.error("Error turning off pump: %s", e)
     
     def _update_state_from_device(self) -> None:
         """Update entity state from device programs."""
@@ -424,54 +385,51 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         power_watts = getattr(self._device, 'power', 0)  # s18 field
         flow_rate = getattr(self._device, 'flow_rate', 0)  # s26/10
         
-        if DEBUG_INFO:
-            _LOGGER.debug(f"API Status - Motor: {motor_rpm} RPM, Power: {power_watts}W, Flow: {flow_rate} GPM")
-            _LOGGER.debug(f"Relay states - Relay1 (lights): {self._device.relay1_on}, Relay2 (heater): {self._device.relay2_on}")
+        if DEBUG_INFO and _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("API Status - Motor: %s RPM, Power: %sW, Flow: %s GPM", motor_rpm, power_watts, flow_rate)
+            _LOGGER.debug("Relay states - Relay1 (lights): %s, Relay2 (heater): %s", self._device.relay1_on, self._device.relay2_on)
             running_programs = [(p.id, p.name) for p in self._device.programs if p.running]
             if running_programs:
-                _LOGGER.debug(f"Running programs: {running_programs}")
+                _LOGGER.debug("Running programs: %s", running_programs)
         
         # Determine if pump is running based on motor speed or power draw
         pump_is_running = motor_rpm > 0 or power_watts > 10  # 10W threshold for noise
         
         if pump_is_running:
-            self._attr_is_on = True
+            self._set_on(True)
             
             # Convert RPM to percentage (typical pump range 1000-3450 RPM)
             # Adjust these values based on your specific pump model
             MIN_RPM = 1000
             MAX_RPM = 3450
             
+            # The running configured program determines the preset
+            preset_mode = None
+            for program_id, program_preset in self._program_to_preset.items():
+                program = self._device.programs_by_id.get(program_id)
+                if program is not None and program.running:
+                    preset_mode = program_preset
+                    _LOGGER.debug("Running via configured program %s (%s)", program.id, program.name)
+                    break
+            self._attr_preset_mode = preset_mode
+            
             if motor_rpm > 0:
                 # Calculate percentage from actual RPM
                 percentage = int(((motor_rpm - MIN_RPM) / (MAX_RPM - MIN_RPM)) * 100)
                 percentage = max(0, min(100, percentage))  # Clamp to 0-100
                 self._attr_percentage = percentage
                 
-                # Update preset mode based on actual speed
-                self._update_preset_mode(percentage)
-                
-                _LOGGER.info(f"Pump ON at {motor_rpm} RPM ({percentage}%), {power_watts}W, {flow_rate} GPM")
+                _LOGGER.info("Pump ON at %s RPM (%s%%), %sW, %s GPM", motor_rpm, percentage, power_watts, flow_rate)
             else:
                 # Pump is on but no RPM data (shouldn't happen normally)
-                self._attr_percentage = 50
-                self._attr_preset_mode = "medium"
-                _LOGGER.warning(f"Pump ON (detected by power {power_watts}W) but no RPM data")
-            
-            # Log which program is controlling it (for information only)
-            for program in self._device.programs:
-                if program.running:
-                    if program.id in self._program_to_speed:
-                        _LOGGER.debug(f"Running via configured program {program.id} ({program.name})")
-                    else:
-                        _LOGGER.debug(f"Running via program {program.id} ({program.name})")
+                self._attr_percentage = PRESET_MODES[preset_mode] if preset_mode else 50
+                _LOGGER.warning("Pump ON (detected by power %sW) but no RPM data", power_watts)
         else:
             # Pump is off
             self._attr_percentage = 0
-            self._attr_is_on = False
+            self._set_on(False)
             self._attr_preset_mode = "off"
-            if DEBUG_INFO:
-                _LOGGER.debug("Pump is OFF (no motor speed or power draw)")
+            _LOGGER.debug("Pump is OFF (no motor speed or power draw)")
     
     @property
     def extra_state_attributes(self):
@@ -503,30 +461,38 @@ class PentairPumpFan(CoordinatorEntity, FanEntity):
         
         return attrs
     
-    async def _notify_safety_override(self, requested: int, actual: int) -> None:
+    @callback
+    def _notify_safety_override(self, requested: int, actual: int) -> None:
         """Notify user when speed is adjusted for safety."""
-        await self.hass.services.async_call(
-            "persistent_notification",
-            "create",
-            {
-                "title": "Pool Pump Safety Override",
-                "message": f"Pool pump speed adjusted for heater safety.\n"
-                          f"Requested: {requested}%\n"
-                          f"Set to: {actual}% (minimum for heater operation)\n"
-                          f"Turn off heater to use lower speeds.",
-                "notification_id": "pentair_pump_safety"
-            }
+        async_pn_create(
+            self.hass,
+            f"Pool pump speed adjusted for heater safety.\n"
+            f"Requested: {requested}%\n"
+            f"Set to: {actual}% (minimum for heater operation)\n"
+            f"Turn off heater to use lower speeds.",
+            title="Pool Pump Safety Override",
+            notification_id="pentair_pump_safety",
         )
     
     def update_heater_state(self, heater_on: bool) -> None:
         """Update heater state for safety checks."""
-        _LOGGER.info(f"Heater state updated: {'ON' if heater_on else 'OFF'}")
+        _LOGGER.info("Heater state updated: %s", "ON" if heater_on else "OFF")
         self._heater_on = heater_on
         
         # If heater just turned on and pump is below 50%, force increase
-        if heater_on and 0 < self._attr_percentage < 50:
+        # Skip while a speed change is already pending; it goes through the
+        # same debouncer and the safety check runs again on the next call
+        if heater_on and 0 < self._attr_percentage < 50 and self._debounce_unsub is None:
             _LOGGER.info("Heater turned on - increasing pump speed to minimum 50%")
-            asyncio.create_task(self.async_set_percentage(50))
+            self.hass.async_create_task(
+                self.async_set_percentage(50), "pentair_heater_safety_speedup"
+            )
+    
+    @callback
+    def _handle_pump_speed_changed(self) -> None:
+        """Refresh state after another entity changed the pump program."""
+        self._update_state_from_device()
+        self.async_write_ha_state()
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -8,11 +8,10 @@ from homeassistant.components.light import LightEntity, ColorMode
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEBUG_INFO
-from .pentaircloud_modified import PentairCloudHub, PentairDevice, PentairPumpProgram
+from .const import DOMAIN, RELAY_PROGRAM_LIGHTS
+from .pentaircloud_modified import PentairCloudHub, PentairDevice
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,109 +22,30 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Pentair lights."""
-    hub = hass.data[DOMAIN][config_entry.entry_id]["pentair_cloud_hub"]
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
-    devices: list[PentairDevice] = await hass.async_add_executor_job(hub.get_devices)
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    hub = entry_data["hub"]
+    coordinator = entry_data["coordinator"]
+    devices: list[PentairDevice] = entry_data["devices"]
     
     # Get relay program mapping from config
-    lights_program = config_entry.data.get("relay_lights", 5)
+    lights_program = config_entry.data.get("relay_lights", RELAY_PROGRAM_LIGHTS)
     
     entities = []
     
     for device in devices:
-        # Add program entities (hidden by default for diagnostics)
-        for program in device.programs:
-            entities.append(PentairProgramLight(_LOGGER, hub, device, program, coordinator))
-            
         # Create light entity for pool lights
         entities.append(PentairRelayLight(_LOGGER, hub, device, lights_program, coordinator))
     
-    _LOGGER.info(f"Setting up {len(entities)} light entities")
-    async_add_entities(entities, update_before_add=True)
-
-
-class PentairProgramLight(CoordinatorEntity, LightEntity):
-    """Representation of a Pentair program as a light (hidden by default)."""
-    
-    _attr_color_mode = ColorMode.ONOFF
-    _attr_supported_color_modes = {ColorMode.ONOFF}
-    _attr_entity_category = EntityCategory.DIAGNOSTIC  # Hide by default
-
-    def __init__(
-        self,
-        logger: logging.Logger,
-        hub: PentairCloudHub,
-        device: PentairDevice,
-        program: PentairPumpProgram,
-        coordinator,
-    ) -> None:
-        """Initialize the program light."""
-        super().__init__(coordinator)
-        self._logger = logger
-        self._hub = hub
-        self._device = device
-        self._program = program
-        self._attr_name = f"{device.nickname} - {program.name} (Program)"
-        self._attr_unique_id = f"pentair_{device.pentair_device_id}_{program.id}"
-        self._is_on = program.running
-        
-        if DEBUG_INFO:
-            self._logger.info(f"Pentair Cloud Program {self._attr_name} Configured")
-
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {
-                (DOMAIN, f"pentair_{self._device.pentair_device_id}")
-            },
-            "name": self._device.nickname,
-            "model": self._device.nickname,
-            "sw_version": "1.0",
-            "manufacturer": "Pentair",
-        }
-
-    @property
-    def is_on(self) -> bool:
-        """Return true if the program is running."""
-        return self._is_on
-
-    def turn_on(self, **kwargs) -> None:
-        """Turn on the program."""
-        if DEBUG_INFO:
-            self._logger.info(
-                f"Activating program {self._program.id} on device {self._device.pentair_device_id}"
-            )
-        self._hub.activate_program_concurrent(
-            self._device.pentair_device_id, self._program.id
-        )
-        self._is_on = True
-
-    def turn_off(self, **kwargs) -> None:
-        """Turn off the program."""
-        if DEBUG_INFO:
-            self._logger.info(
-                f"Deactivating program {self._program.id} on device {self._device.pentair_device_id}"
-            )
-        self._hub.deactivate_program(
-            self._device.pentair_device_id, self._program.id
-        )
-        self._is_on = False
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from coordinator."""
-        self._is_on = self._program.running
-        if DEBUG_INFO:
-            self._logger.info(
-                f"Program {self._program.id} update: running={self._is_on}"
-            )
-        self.async_write_ha_state()
+    _LOGGER.info("Setting up %s light entities", len(entities))
+    # The coordinator has already done its first refresh during setup
+    async_add_entities(entities)
 
 
 class PentairRelayLight(CoordinatorEntity, LightEntity):
     """Representation of a Pentair pool light controlled via relay."""
     
+    __slots__ = ("_logger", "_hub", "_device", "_lights_program", "_is_on")
+    
     _attr_icon = "mdi:lightbulb"
     _attr_color_mode = ColorMode.ONOFF
     _attr_supported_color_modes = {ColorMode.ONOFF}
@@ -146,21 +66,9 @@ class PentairRelayLight(CoordinatorEntity, LightEntity):
         self._lights_program = lights_program
         self._attr_name = f"{device.nickname} Light"
         self._attr_unique_id = f"pentair_{device.pentair_device_id}_pool_light"
+        self._attr_device_info = device.device_info
         self._is_on = False
     
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {
-                (DOMAIN, f"pentair_{self._device.pentair_device_id}")
-            },
-            "name": self._device.nickname,
-            "model": self._device.nickname,
-            "sw_version": "1.0",
-            "manufacturer": "Pentair",
-        }
-    
     @property
     def is_on(self) -> bool:
         """Return true if the light is on."""
@@ -168,31 +76,35 @@ class PentairRelayLight(CoordinatorEntity, LightEntity):
     
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the light."""
-        if DEBUG_INFO:
-            self._logger.info(f"Turning on pool lights")
+        self._logger.debug("Turning on pool lights")
         
         # Activate lights program (no pump check - lights work independently)
-        await self.hass.async_add_executor_job(
+        await self._hub.async_run(
             self._hub.activate_program_concurrent,
             self._device.pentair_device_id,
             self._lights_program
         )
         
         self._is_on = True
+        self.async_write_ha_state()
+        self.coordinator.async_boost_polling()
+        await self.coordinator.async_request_refresh()
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
-        if DEBUG_INFO:
-            self._logger.info(f"Turning off pool lights")
+        self._logger.debug("Turning off pool lights")
         
         # Deactivate lights program
-        await self.hass.async_add_executor_job(
+        await self._hub.async_run(
             self._hub.deactivate_program,
             self._device.pentair_device_id,
             self._lights_program
         )
         
         self._is_on = False
+        self.async_write_ha_state()
+        self.coordinator.async_boost_polling()
+        await self.coordinator.async_request_refresh()
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -200,14 +112,15 @@ class PentairRelayLight(CoordinatorEntity, LightEntity):
         # Use actual relay state from API (s21 for relay1/lights)
         self._is_on = getattr(self._device, 'relay1_on', False)
         
-        if DEBUG_INFO:
+        if self._logger.isEnabledFor(logging.DEBUG):
             # Also check program state for debugging
-            for program in self._device.programs:
-                if program.id == self._lights_program:
-                    self._logger.debug(
-                        f"Lights relay physical state: {self._is_on}, "
-                        f"program {self._lights_program} running: {program.running}"
-                    )
-                    break
+            program = self._device.programs_by_id.get(self._lights_program)
+            if program is not None:
+                self._logger.debug(
+                    "Lights relay physical state: %s, program %s running: %s",
+                    self._is_on,
+                    self._lights_program,
+                    program.running,
+                )
         
         self.async_write_ha_state()
\ No newline at end of file
@@ -1,14 +1,21 @@
 """Modified Pentair Cloud API with concurrent program support."""
 from pycognito import Cognito
 from homeassistant.core import HomeAssistant
+import asyncio
+import base64
+import random
 import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from logging import Logger
 from requests_aws4auth import AWS4Auth
 from homeassistant.components.light import ATTR_BRIGHTNESS, PLATFORM_SCHEMA, LightEntity
+import threading
 import time
-import json
-from .const import DEBUG_INFO
+import orjson
+from .const import DEBUG_INFO, DOMAIN
 
 AWS_REGION = "us-west-2"
 AWS_USER_POOL_ID = "us-west-2_lbiduhSwD"
@@ -23,9 +30,56 @@ PENTAIR_DEVICE_SERVICE_PATH = "/device/device-service/user/device/"
 UPDATE_MIN_SECONDS = 10  # Minimum time between two update requests - reduced from 60
 PROGRAM_START_MIN_SECONDS = 5  # Reduced for concurrent activation
 DEBOUNCE_SECONDS = 2  # Debounce delay for rapid command changes
+PUMP_START_BACKOFF_SECONDS = (0.1, 0.2, 0.4, 0.8, 1.5)  # Status polls while waiting for pump
+STOP_RETRY_ATTEMPTS = 3  # Extra stop requests when the API does not acknowledge one
+STOP_RETRY_DELAY_SECONDS = 0.1
+TOKEN_REFRESH_MARGIN_SECONDS = 300  # Refresh the id token this long before it expires
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds for every API request
+ACTIVATE_TIMEOUT = (3, 8)  # Tighter while a user waits on a program start
+API_MAX_ATTEMPTS = 4  # Tries per request when the API answers 429 or 5xx
+API_BACKOFF_BASE_SECONDS = 0.5
+API_BACKOFF_CAP_SECONDS = 8
+API_BACKOFF_JITTER_SECONDS = 0.25
+API_RATE_INITIAL = 2.0  # Requests per second, adapted to how the API responds
+API_RATE_MIN = 0.25
+API_RATE_MAX = 10.0
+API_BURST = 5  # Requests allowed back to back before the rate applies
+HUB_EXECUTOR_WORKERS = 4  # Threads for hub I/O, kept off the shared HA executor
+# Per program index: (id, enabled key, type key, control key, name key, default name)
+PROGRAM_FIELD_KEYS = tuple(
+    (i, f"zp{i}e13", f"zp{i}e5", f"zp{i}e10", f"zp{i}e2", f"Program {i}")
+    for i in range(1, 9)
+)
+
+
+def _token_expiry(token: str) -> float | None:
+    """Return the exp claim of a JWT without verifying it, or None."""
+    try:
+        payload = token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _is_timeout_message(response_data) -> bool:
+    """Return True if an API error body reports a session timeout."""
+    return isinstance(response_data, dict) and "timeout" in str(
+        response_data.get("message", "")
+    )
+
+
+def _field_value(fields: dict, key: str, default: str | None = "0") -> str | None:
+    """Return the value of a device status field, or default if it is missing."""
+    field = fields.get(key)
+    if field is None:
+        return default
+    return field.get("value", default)
 
 
 class PentairPumpProgram:
+    __slots__ = ("id", "name", "program_type", "control_value", "running")
+
     def __init__(
         self, id: int, name: str, program_type: int, control_value: int = 0
     ) -> None:
@@ -47,65 +101,63 @@ class PentairDevice:
         self.LOGGER = LOGGER
         self.pentair_device_id = pentair_device_id
         self.nickname = nickname
+        # Shared by every entity of this device as its device registry info
+        self.identifier = (DOMAIN, f"pentair_{pentair_device_id}")
+        self.device_info = {
+            "identifiers": {self.identifier},
+            "name": nickname,
+            "model": nickname,
+            "sw_version": "1.0",
+            "manufacturer": "Pentair",
+        }
         self.status = False
         self.last_program_start = None
         self.active_pump_program = None  # s14 - which program controls the pump
         self.programs = []
+        self.programs_by_id = {}  # Index into programs, kept in sync by update_program
         self.pump_running = False
         self.relay1_on = False
         self.relay2_on = False
+        self.relay_states = (False, False)  # (relay1_on, relay2_on), set at refresh
         self.motor_speed = 0
         self.power = 0
         self.flow_rate = 0
 
     def update_program(
         self, id: int, name: str, program_type: int, control_value: int
-    ) -> None:
-        exists = False
-        for program in self.programs:
-            if program.id == id:  # update
-                exists = True
-                program.name = name
-                program.program_type = program_type
-                program.control_value = control_value
-                program.running = control_value == 3
-                if DEBUG_INFO:
-                    self.LOGGER.info(
-                        f"Update program for device {self.pentair_device_id} / "
-                        f"{id} - {name} (e10={control_value})"
-                    )
-        if not exists:
-            self.programs.append(
-                PentairPumpProgram(id, name, program_type, control_value)
-            )
+    ) -> bool:
+        """Add or update a program. Returns True if its run state changed."""
+        changed = False
+        program = self.programs_by_id.get(id)
+        if program is not None:  # update
+            changed = program.control_value != control_value
+            program.name = name
+            program.program_type = program_type
+            program.control_value = control_value
+            program.running = control_value == 3
+            if DEBUG_INFO:
+                self.LOGGER.info(
+                    f"Update program for device {self.pentair_device_id} / "
+                    f"{id} - {name} (e10={control_value})"
+                )
+        else:
+            program = PentairPumpProgram(id, name, program_type, control_value)
+            self.programs.append(program)
+            self.programs_by_id[id] = program
+            changed = True
             if DEBUG_INFO:
                 self.LOGGER.info(
                     f"Found new program for device {self.pentair_device_id} / "
                     f"{id} - {name}"
                 )
+        return changed
 
     def get_other_relay_state(self, relay_number: int) -> bool:
         """Get the state of the other relay."""
-        if relay_number == 1:
-            return self.relay2_on
-        else:
-            return self.relay1_on
+        return self.relay_states[2 - relay_number]
 
 
 class PentairCloudHub:
-    global AWS_USER_POOL_ID
-    global AWS_CLIENT_ID
-    global AWS_REGION
-    global AWS_COGNITO_ENDPOINT
-    global AWS_USER_POOL_ID
-    global AWS_IDENTITY_POOL_ID
-    global PENTAIR_ENDPOINT
-    global PENTAIR_DEVICES_PATH
-    global PENTAIR_DEVICES_2_PATH
-    global PENTAIR_DEVICE_SERVICE_PATH
-    global UPDATE_MIN_SECONDS
-    global PROGRAM_START_MIN_SECONDS
-
     def __init__(
         self,
         LOGGER: Logger,
@@ -113,14 +165,114 @@ class PentairCloudHub:
         self.cognito_client = None
         self.LOGGER = LOGGER
         self.AWS_TOKEN = None
+        self._token_exp: float | None = None
         self.AWS_IDENTITY_ID = None
         self.AWS_ACCESS_KEY_ID = None
         self.AWS_SECRET_ACCESS_KEY = None
         self.AWS_SESSION_TOKEN = None
+        self._aws_auth: AWS4Auth | None = None  # Rebuilt when the credentials rotate
+        self._cog_identity = None  # Created on first use, then reused
         self.last_update = None
+        # Re-entrant: a token rotation during a refresh repopulates the devices,
+        # which refreshes the status again on the same thread
+        self._refresh_lock = threading.RLock()
+        self._refresh_future: asyncio.Future | None = None  # In-flight async_refresh
+        self.last_revision = 0  # Incremented whenever a program's run state changes
         self.username = None
         self.password = None
         self.devices = []
+        self._devices_by_id: dict[str, PentairDevice] = {}
+        # One pooled session keeps the TLS connection to the API alive
+        self._session = requests.Session()
+        self._session.mount(
+            "https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=0)
+        )
+        # Adaptive token bucket shared by every API call
+        self._rate_lock = threading.Lock()
+        self._rate = API_RATE_INITIAL
+        self._tokens = float(API_BURST)
+        self._tokens_updated = time.monotonic()
+        # Blocking hub calls run here so they never starve the HA executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=HUB_EXECUTOR_WORKERS, thread_name_prefix="pentair"
+        )
+
+    async def async_run(self, func, *args):
+        """Run a blocking hub method on the hub's own executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def async_refresh(self, force: bool = False) -> None:
+        """Refresh device status, sharing one job between concurrent callers.
+
+        Callers that arrive while a refresh is running await that refresh
+        instead of tying up another executor thread on the refresh lock.
+        """
+        if self._refresh_future is None or self._refresh_future.done():
+            self._refresh_future = asyncio.ensure_future(
+                self.async_run(self.update_pentair_devices_status, force)
+            )
+        # A cancelled caller must not cancel the refresh others are awaiting
+        await asyncio.shield(self._refresh_future)
+
+    def shutdown(self) -> None:
+        """Release the hub's executor and HTTP connections."""
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def _acquire_request_token(self) -> None:
+        """Block until the token bucket allows another API request."""
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                API_BURST, self._tokens + (now - self._tokens_updated) * self._rate
+            )
+            self._tokens_updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+
+    def _adjust_request_rate(self, success: bool) -> None:
+        with self._rate_lock:
+            if success:
+                self._rate = min(API_RATE_MAX, self._rate * 1.1)
+            else:
+                self._rate = max(API_RATE_MIN, self._rate * 0.5)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        timeout: tuple[float, float] = DEFAULT_TIMEOUT,
+        **kwargs,
+    ) -> requests.Response:
+        """Send an API request, backing off and retrying on 429 and 5xx.
+
+        Raises requests.HTTPError if the final response is not successful.
+        """
+        for attempt in range(API_MAX_ATTEMPTS):
+            self._acquire_request_token()
+            response = self._session.request(method, url, timeout=timeout, **kwargs)
+            if response.status_code != 429 and response.status_code < 500:
+                self._adjust_request_rate(True)
+                response.raise_for_status()
+                return response
+            self._adjust_request_rate(False)
+            if attempt == API_MAX_ATTEMPTS - 1:
+                break
+            delay = min(
+                API_BACKOFF_CAP_SECONDS, API_BACKOFF_BASE_SECONDS * 2**attempt
+            ) + random.uniform(0, API_BACKOFF_JITTER_SECONDS)
+            self.LOGGER.warning(
+                "Pentair API returned %s, retrying in %.1fs",
+                response.status_code,
+                delay,
+            )
+            time.sleep(delay)
+        response.raise_for_status()
+        return response
 
     def get_cognito_client(self, usr: str) -> Cognito:
         return Cognito(AWS_USER_POOL_ID, AWS_CLIENT_ID, username=usr)
@@ -128,19 +280,41 @@ class PentairCloudHub:
     def get_devices(self) -> list[PentairDevice]:
         return self.devices
 
+    def _get_program(self, deviceId: str, program_id: int) -> PentairPumpProgram | None:
+        device = self._devices_by_id.get(deviceId)
+        return device.programs_by_id.get(program_id) if device is not None else None
+
     def populate_AWS_token(self) -> None:
         if self.cognito_client is not None:
+            # Skip the Cognito round trips while the current token is still valid
+            if (
+                self._token_exp is not None
+                and time.time() < self._token_exp - TOKEN_REFRESH_MARGIN_SECONDS
+            ):
+                return
             self.cognito_client.check_token()
             new_token = self.cognito_client.get_user()._metadata["id_token"]
             if self.AWS_TOKEN != new_token:  # Token has been refreshed
                 self.AWS_TOKEN = new_token
+                self._token_exp = _token_expiry(new_token)
+                self._session.headers.update(self.get_pentair_header())
                 self.populate_AWS_and_data_fields()
 
     def populate_AWS_and_data_fields(self) -> None:
         if self.AWS_TOKEN is None:
             self.populate_AWS_token()
         try:
-            client = boto3.client("cognito-identity", region_name=AWS_REGION)
+            if self._cog_identity is None:
+                self._cog_identity = boto3.client(
+                    "cognito-identity",
+                    region_name=AWS_REGION,
+                    config=Config(
+                        max_pool_connections=10,
+                        tcp_keepalive=True,
+                        retries={"mode": "standard", "max_attempts": 3},
+                    ),
+                )
+            client = self._cog_identity
             # IdentityId
             response = client.get_id(
                 IdentityPoolId=AWS_IDENTITY_POOL_ID,
@@ -155,6 +329,7 @@ class PentairCloudHub:
             self.AWS_ACCESS_KEY_ID = response["Credentials"]["AccessKeyId"]
             self.AWS_SECRET_ACCESS_KEY = response["Credentials"]["SecretKey"]
             self.AWS_SESSION_TOKEN = response["Credentials"]["SessionToken"]
+            self._aws_auth = None
             if DEBUG_INFO:
                 self.LOGGER.info("Pentair Cloud complete Populate AWS Fields")
             self.populate_pentair_devices()
@@ -172,34 +347,40 @@ class PentairCloudHub:
         }
 
     def get_AWS_auth(self) -> AWS4Auth:
-        return AWS4Auth(
-            self.AWS_ACCESS_KEY_ID,
-            self.AWS_SECRET_ACCESS_KEY,
-            AWS_REGION,
-            "execute-api",
-            session_token=self.AWS_SESSION_TOKEN,
-        )
+        if self._aws_auth is None:
+            self._aws_auth = AWS4Auth(
+                self.AWS_ACCESS_KEY_ID,
+                self.AWS_SECRET_ACCESS_KEY,
+                AWS_REGION,
+                "execute-api",
+                session_token=self.AWS_SESSION_TOKEN,
+            )
+        return self._aws_auth
 
     def populate_pentair_devices(self) -> None:
         if self.AWS_TOKEN is not None:
             try:
                 # GetDeviceConfiguration
                 endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICES_PATH
-                response = requests.get(
+                response = self._request(
+                    "GET",
                     endpoint,
                     auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
                 )
                 for device in response.json()["data"]:
                     if device["deviceType"] == "IF31":
                         if device["status"] == "ACTIVE":
-                            self.devices.append(
-                                PentairDevice(
-                                    self.LOGGER,
-                                    device["deviceId"],
-                                    device["productInfo"]["nickName"],
-                                )
+                            # Token rotation repopulates the list; entities hold
+                            # the existing instance, so never add a second one
+                            if device["deviceId"] in self._devices_by_id:
+                                continue
+                            pentair_device = PentairDevice(
+                                self.LOGGER,
+                                device["deviceId"],
+                                device["productInfo"]["nickName"],
                             )
+                            self.devices.append(pentair_device)
+                            self._devices_by_id[device["deviceId"]] = pentair_device
                             if DEBUG_INFO:
                                 self.LOGGER.info(
                                     "Found compatible device:" + device["deviceId"]
@@ -228,112 +409,156 @@ class PentairCloudHub:
                 "Exception while setting up Pentair Cloud (Empty token in populate Pentair Device ID)."
             )
 
-    def update_pentair_devices_status(self) -> None:
-        if (
-            self.last_update == None
-            or time.time() - self.last_update > UPDATE_MIN_SECONDS
-        ):
+    def _status_is_fresh(self) -> bool:
+        return (
+            self.last_update is not None
+            and time.monotonic() - self.last_update <= UPDATE_MIN_SECONDS
+        )
+
+    def update_pentair_devices_status(self, force: bool = False) -> None:
+        if not force and self._status_is_fresh():
             if DEBUG_INFO:
-                self.LOGGER.info("Pentair Cloud - Update Devices Status")
-            self.last_update = time.time()
-            self.populate_AWS_token()
-            if self.AWS_TOKEN is not None:
+                self.LOGGER.info(
+                    "Pentair Cloud - Update Devices Status Requested but before min time"
+                )
+            return
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not force and self._status_is_fresh():
+                return
+            self._refresh_pentair_devices_status()
+
+    def _refresh_pentair_devices_status(self) -> None:
+        if DEBUG_INFO:
+            self.LOGGER.info("Pentair Cloud - Update Devices Status")
+        # Only a parsed reply counts as fresh status; see _status_is_fresh
+        requested_at = time.monotonic()
+        self.populate_AWS_token()
+        if self.AWS_TOKEN is not None:
+            response_data = None
+            try:
+                # Ask for exactly the devices the status loop below can update
+                devices_json = orjson.dumps({"deviceIds": list(self._devices_by_id)})
+                endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICES_2_PATH
+                response = self._request(
+                    "POST",
+                    endpoint,
+                    auth=self.get_AWS_auth(),
+                    data=devices_json,
+                )
+                response_data = orjson.loads(response.content)
+                for device_response in response_data["response"]["data"]:
+                    device = self._devices_by_id.get(device_response["deviceId"])
+                    if device is None:
+                        continue
+                    fields = device_response["fields"]
+
+                    # Update device status fields
+                    device.active_pump_program = int(_field_value(fields, "s14", "99"))
+                    if device.active_pump_program == 99:
+                        device.active_pump_program = None
+                    else:
+                        device.active_pump_program += 1  # Convert from 0-based to 1-based
+
+                    device.pump_running = device.active_pump_program is not None
+                    device.motor_speed = int(_field_value(fields, "s19", "0")) / 10
+                    device.power = int(_field_value(fields, "s18", "0"))
+                    device.flow_rate = int(_field_value(fields, "s26", "0")) / 10
+                    # Keep physical relay status for reference
+                    device.relay1_on = _field_value(fields, "s21", "0") == "1"
+                    device.relay2_on = _field_value(fields, "s22", "0") == "1"
+                    device.relay_states = (device.relay1_on, device.relay2_on)
+
+                    # Update program states
+                    for i, k13, k5, k10, k2, default_name in PROGRAM_FIELD_KEYS:
+                        if _field_value(fields, k13, None) == "1":  # Program is active
+                            program_type = int(_field_value(fields, k5, "0"))
+                            control_value = int(_field_value(fields, k10, "0"))
+                            if device.update_program(
+                                i,
+                                _field_value(fields, k2, default_name),
+                                program_type,
+                                control_value
+                            ):
+                                self.last_revision += 1
+                self.last_update = requested_at
+
+            except requests.HTTPError as err:
+                # _request raised before the body was parsed, so read it here
                 try:
-                    devices_json_list = []
-                    for device in self.devices:
-                        devices_json_list.append('"' + device.pentair_device_id + '"')
-                    devices_json = (
-                        '{"deviceIds": [' + ",".join(devices_json_list) + "]}"
-                    )
-                    endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICES_2_PATH
-                    response = requests.post(
-                        endpoint,
-                        auth=self.get_AWS_auth(),
-                        headers=self.get_pentair_header(),
-                        data=devices_json,
-                    )
-                    response_data = response.json()
-                    for device_response in response_data["response"]["data"]:
-                        for device in self.devices:
-                            if device.pentair_device_id == device_response["deviceId"]:
-                                fields = device_response["fields"]
-                                
-                                # Update device status fields
-                                device.active_pump_program = int(fields.get("s14", {}).get("value", "99"))
-                                if device.active_pump_program == 99:
-                                    device.active_pump_program = None
-                                else:
-                                    device.active_pump_program += 1  # Convert from 0-based to 1-based
-                                
-                                device.pump_running = device.active_pump_program is not None
-                                device.motor_speed = int(fields.get("s19", {}).get("value", "0")) / 10
-                                device.power = int(fields.get("s18", {}).get("value", "0"))
-                                device.flow_rate = int(fields.get("s26", {}).get("value", "0")) / 10
-                                # Keep physical relay status for reference
-                                device.relay1_on = fields.get("s21", {}).get("value", "0") == "1"
-                                device.relay2_on = fields.get("s22", {}).get("value", "0") == "1"
-                                
-                                # Update program states
-                                for i in range(1, 9):
-                                    if fields.get(f"zp{i}e13", {}).get("value") == "1":  # Program is active
-                                        program_type = int(fields.get(f"zp{i}e5", {}).get("value", "0"))
-                                        control_value = int(fields.get(f"zp{i}e10", {}).get("value", "0"))
-                                        device.update_program(
-                                            i,
-                                            fields.get(f"zp{i}e2", {}).get("value", f"Program {i}"),
-                                            program_type,
-                                            control_value
-                                        )
-
-                except Exception as err:
-                    self.LOGGER.error(
-                        "Exception while updating Pentair Cloud (update device status). %s, %s",
-                        err,
-                        response_data,
-                    )
-                    try:
-                        self.LOGGER.error("Timeout detected. Logging Again")
-                        if "timeout" in response_data["message"]:
-                            self.authenticate(
-                                self.username, self.password
-                            )  # Refresh authentication in case of timeout
-                    except Exception as err2:
-                        self.LOGGER.error(
-                            "ERROR in Timeout detection loop.",
-                            err2,
-                        )
-            else:
+                    response_data = orjson.loads(err.response.content)
+                except orjson.JSONDecodeError:
+                    response_data = None
                 self.LOGGER.error(
-                    "Exception while updating Pentair Cloud (Empty token in device status)."
+                    "HTTP error while updating Pentair Cloud (update device status). %s, %s",
+                    err,
+                    response_data,
                 )
-        else:
-            if DEBUG_INFO:
-                self.LOGGER.info(
-                    "Pentair Cloud - Update Devices Status Requested but before min time"
+                if err.response.status_code in (401, 403) or _is_timeout_message(
+                    response_data
+                ):
+                    self._reauthenticate()
+            except Exception as err:
+                self.LOGGER.error(
+                    "Exception while updating Pentair Cloud (update device status). %s, %s",
+                    err,
+                    response_data,
                 )
+                if _is_timeout_message(response_data):
+                    self._reauthenticate()
+        else:
+            self.LOGGER.error(
+                "Exception while updating Pentair Cloud (Empty token in device status)."
+            )
+
+    def _reauthenticate(self) -> None:
+        """Log in again after the API reported an expired or timed-out session."""
+        self.LOGGER.error("Timeout detected. Logging Again")
+        try:
+            self.authenticate(self.username, self.password)
+        except Exception as err:
+            self.LOGGER.error("ERROR in Timeout detection loop. %s", err)
 
-    def activate_program_concurrent(self, deviceId: str, program_id: int) -> None:
+    def activate_program_concurrent(self, deviceId: str, program_id: int) -> bool:
         """Activate a program allowing concurrent activation."""
         if DEBUG_INFO:
             self.LOGGER.info(
                 f"Pentair Cloud - Activating program {program_id} on device {deviceId}"
             )
+        return self.activate_programs_concurrent(deviceId, [program_id])
+
+    def activate_programs_concurrent(self, deviceId: str, program_ids: list[int]) -> bool:
+        """Activate several programs with a single request."""
+        # Leave out programs the fresh cached status already shows as active
+        if self._status_is_fresh():
+            pending_ids = []
+            for program_id in program_ids:
+                program = self._get_program(deviceId, program_id)
+                if program is None or program.control_value != 3:
+                    pending_ids.append(program_id)
+            if not pending_ids:
+                if DEBUG_INFO:
+                    self.LOGGER.info(f"Programs {program_ids} already active on device {deviceId}")
+                return True
+            program_ids = pending_ids
         
         self.populate_AWS_token()
         if self.AWS_TOKEN is not None:
             try:
                 endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICE_SERVICE_PATH + deviceId
-                field_name = f"zp{program_id}e10"
-                payload = {"payload": {field_name: "3"}}
+                payload = {
+                    "payload": {f"zp{program_id}e10": "3" for program_id in program_ids}
+                }
                 
                 if DEBUG_INFO:
                     self.LOGGER.info(f"Sending payload: {payload} to {endpoint}")
                 
-                response = requests.put(
+                response = self._request(
+                    "PUT",
                     endpoint,
+                    timeout=ACTIVATE_TIMEOUT,
                     auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
-                    data=json.dumps(payload),
+                    data=orjson.dumps(payload),
                 )
                 
                 if DEBUG_INFO:
@@ -346,25 +571,49 @@ class PentairCloudHub:
                     raise Exception("Wrong response code activating program")
                 
                 # Find and update the program state
-                for device in self.devices:
-                    if device.pentair_device_id == deviceId:
-                        for program in device.programs:
-                            if program.id == program_id:
-                                program.running = True
-                                program.control_value = 3
+                for program_id in program_ids:
+                    program = self._get_program(deviceId, program_id)
+                    if program is not None:
+                        if program.control_value != 3:
+                            self.last_revision += 1
+                        program.running = True
+                        program.control_value = 3
+                return True  # Success
                 
             except Exception as err:
                 self.LOGGER.error(
                     "Exception with Pentair API (Activate Program). %s",
                     err,
                 )
+                return False  # Failed
         else:
             self.LOGGER.error(
                 "Exception while activating program (Empty token)."
             )
             return False
 
-    def deactivate_program(self, deviceId: str, program_id: int) -> None:
+    def _stop_value(self, program: PentairPumpProgram | None) -> str:
+        """Return the e10 value that stops program.
+
+        Pump programs (identified by name) stop with e10=2 when they are
+        manual programs and e10=1 otherwise. Relay programs, and programs we
+        have not discovered, use e10=0 to fully turn off.
+        """
+        if program is None or not (
+            "Speed" in program.name
+            or "Quick Clean" in program.name
+            or "Daily Schedule" in program.name
+        ):
+            return "0"
+        if DEBUG_INFO:
+            self.LOGGER.info(f"Program {program.id} '{program.name}' identified as pump program")
+        if program.program_type == 2:  # Manual program
+            if DEBUG_INFO:
+                self.LOGGER.info(f"Program {program.id} is manual type, using e10=2 to stop")
+            return "2"
+        return "1"
+
+    def deactivate_program(self, deviceId: str, program_id: int) -> bool:
         """Deactivate a specific program.
         
         Since we only use manual programs now:
@@ -375,62 +624,47 @@ class PentairCloudHub:
             self.LOGGER.info(
                 f"Pentair Cloud - Deactivating program {program_id} on device {deviceId}"
             )
+        return self.deactivate_programs(deviceId, [program_id])
+
+    def deactivate_programs(self, deviceId: str, program_ids: list[int]) -> bool:
+        """Deactivate several programs with a single request."""
+        stop_values = {
+            program_id: self._stop_value(self._get_program(deviceId, program_id))
+            for program_id in program_ids
+        }
+        # Leave out programs the fresh cached status already shows as stopped
+        if self._status_is_fresh():
+            for program_id in program_ids:
+                program = self._get_program(deviceId, program_id)
+                if (
+                    program is not None
+                    and program.control_value == int(stop_values[program_id])
+                ):
+                    del stop_values[program_id]
+        if not stop_values:
+            if DEBUG_INFO:
+                self.LOGGER.info(f"Programs {program_ids} already stopped on device {deviceId}")
+            return True
         
         self.populate_AWS_token()
         if self.AWS_TOKEN is not None:
             try:
                 endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICE_SERVICE_PATH + deviceId
-                field_name = f"zp{program_id}e10"
-                
-                # Determine if this is a pump program by checking the actual program name
-                is_pump_program = False
-                for device in self.devices:
-                    if device.pentair_device_id == deviceId:
-                        for program in device.programs:
-                            if program.id == program_id:
-                                # Check if this is a speed program or pump control program
-                                if ("Speed" in program.name or 
-                                    "Quick Clean" in program.name or
-                                    "Daily Schedule" in program.name):
-                                    is_pump_program = True
-                                    if DEBUG_INFO:
-                                        self.LOGGER.info(f"Program {program_id} '{program.name}' identified as pump program")
-                                    break
-                        break
-                
-                # Check current state to determine proper stop value
-                # Programs with e10=2 when disabled need e10=2 to stop
-                # Programs with e10=1 when disabled need e10=1 to stop  
-                # Relay programs use e10=0 to fully turn off
-                stop_value = "0"  # Default for relay programs
-                
-                if is_pump_program:
-                    # Check what the disabled state is for this program
-                    for device in self.devices:
-                        if device.pentair_device_id == deviceId:
-                            for program in device.programs:
-                                if program.id == program_id:
-                                    # If program uses e10=2 when disabled (manual programs)
-                                    # we need to send e10=2 to stop
-                                    if program.program_type == 2:  # Manual program
-                                        stop_value = "2"
-                                        if DEBUG_INFO:
-                                            self.LOGGER.info(f"Program {program_id} is manual type, using e10=2 to stop")
-                                    else:
-                                        stop_value = "1"
-                                    break
-                            break
-                
-                payload = {"payload": {field_name: stop_value}}
+                payload = {
+                    "payload": {
+                        f"zp{program_id}e10": stop_value
+                        for program_id, stop_value in stop_values.items()
+                    }
+                }
                 
                 if DEBUG_INFO:
                     self.LOGGER.info(f"Sending deactivation payload: {payload}")
                 
-                response = requests.put(
+                response = self._request(
+                    "PUT",
                     endpoint,
                     auth=self.get_AWS_auth(),
-                    headers=self.get_pentair_header(),
-                    data=json.dumps(payload),
+                    data=orjson.dumps(payload),
                 )
                 
                 if DEBUG_INFO:
@@ -443,13 +677,14 @@ class PentairCloudHub:
                     raise Exception("Wrong response code deactivating program")
                 
                 # Update program state
-                for device in self.devices:
-                    if device.pentair_device_id == deviceId:
-                        for program in device.programs:
-                            if program.id == program_id:
-                                program.running = False
-                                # Set control value to match what we sent
-                                program.control_value = int(stop_value)
+                for program_id, stop_value in stop_values.items():
+                    program = self._get_program(deviceId, program_id)
+                    if program is not None:
+                        if program.control_value != int(stop_value):
+                            self.last_revision += 1
+                        program.running = False
+                        # Set control value to match what we sent
+                        program.control_value = int(stop_value)
                 return True  # Success
                 
             except Exception as err:
@@ -460,13 +695,110 @@ class PentairCloudHub:
                 return False  # Failed
         return False  # No token
 
-    def stop_all_programs(self, deviceId: str) -> None:
-        """Stop all programs on a device."""
+    def start_pump_and_program(
+        self, deviceId: str, pump_program_id: int, program_id: int
+    ) -> bool:
+        """Start a pump program, wait for the pump, then start a second program.
+
+        Runs the whole sequence on the calling (executor) thread so callers
+        only pay for a single hop off the event loop.
+        """
+        self.activate_program_concurrent(deviceId, pump_program_id)
+
+        pump_running = False
+        for delay in PUMP_START_BACKOFF_SECONDS:
+            self.update_pentair_devices_status(force=True)
+            device = self._devices_by_id.get(deviceId)
+            pump_running = device is not None and device.pump_running
+            if pump_running:
+                break
+            time.sleep(delay)
+
+        if not pump_running:
+            self.LOGGER.warning(
+                "Pentair Cloud - Pump on device %s did not report running, starting program %s anyway",
+                deviceId,
+                program_id,
+            )
+
+        return self.activate_program_concurrent(deviceId, program_id)
+
+    def apply_speed_program(
+        self, deviceId: str, stop_ids: list[int], start_id: int | None
+    ) -> bool:
+        """Switch pump speed programs in one blocking call.
+
+        Stops every program in stop_ids with one request and starts start_id
+        (if any). An acknowledged stop is trusted as is; an unacknowledged one
+        is retried a few times before moving on. Returns True if the start
+        (or, when only stopping, every stop) succeeded.
+        """
+        success = True
+        stopped = self.deactivate_programs(deviceId, stop_ids)
+        for _ in range(STOP_RETRY_ATTEMPTS):
+            if stopped:
+                break
+            time.sleep(STOP_RETRY_DELAY_SECONDS)
+            stopped = self.deactivate_programs(deviceId, stop_ids)
+        if not stopped:
+            self.LOGGER.error(f"Failed to stop programs {stop_ids}")
+            success = False
+
+        if start_id is not None:
+            success = self.activate_program_concurrent(deviceId, start_id)
+
+        return success
+
+    def stop_all_programs(self, deviceId: str) -> bool:
+        """Stop all programs on a device with a single request."""
         if DEBUG_INFO:
             self.LOGGER.info(f"Stopping all programs on device {deviceId}")
         
-        for i in range(1, 9):
-            self.deactivate_program(deviceId, i)
+        self.populate_AWS_token()
+        if self.AWS_TOKEN is None:
+            self.LOGGER.error("Exception while stopping programs (Empty token).")
+            return False
+        
+        device = self._devices_by_id.get(deviceId)
+        programs = device.programs_by_id if device is not None else {}
+        stop_values = {i: self._stop_value(programs.get(i)) for i in range(1, 9)}
+        
+        try:
+            endpoint = PENTAIR_ENDPOINT + PENTAIR_DEVICE_SERVICE_PATH + deviceId
+            payload = {
+                "payload": {
+                    k10: stop_values[i] for i, _, _, k10, _, _ in PROGRAM_FIELD_KEYS
+                }
+            }
+            
+            if DEBUG_INFO:
+                self.LOGGER.info(f"Sending deactivation payload: {payload}")
+            
+            response = self._request(
+                "PUT",
+                endpoint,
+                auth=self.get_AWS_auth(),
+                data=orjson.dumps(payload),
+            )
+            response_data = response.json()
+            if response_data.get("data", {}).get("code") != "set_device_success":
+                self.LOGGER.error(f"Failed to stop all programs: {response_data}")
+                raise Exception("Wrong response code stopping all programs")
+        except Exception as err:
+            self.LOGGER.error(
+                "Exception with Pentair API (Stop All Programs). %s",
+                err,
+            )
+            return False
+        
+        # Update program state
+        for program_id, program in programs.items():
+            stop_value = int(stop_values[program_id])
+            if program.control_value != stop_value:
+                self.last_revision += 1
+            program.running = False
+            program.control_value = stop_value
+        return True
 
     def start_program(self, deviceId: str, program_id: int) -> bool:
         """Legacy method - redirects to concurrent activation."""
@@ -481,6 +813,7 @@ class PentairCloudHub:
             u = self.get_cognito_client(username)
             u.authenticate(password)
             self.cognito_client = u
+            self._token_exp = None  # Pick up the new session's token on next use
             self.cognito_client.get_user()
             self.username = username
             self.password = password
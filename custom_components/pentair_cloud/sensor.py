@@ -0,0 +1,64 @@
+"""Platform for program status sensors (diagnostics)."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .pentaircloud_modified import PentairDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Pentair program sensors."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    devices: list[PentairDevice] = entry_data["devices"]
+
+    entities = [PentairProgramsSensor(device, coordinator) for device in devices]
+
+    _LOGGER.info("Setting up %s sensor entities", len(entities))
+    # The coordinator has already done its first refresh during setup
+    async_add_entities(entities)
+
+
+class PentairProgramsSensor(CoordinatorEntity, SensorEntity):
+    """Number of running programs on a device, with every program's state."""
+
+    __slots__ = ("_device",)
+
+    _attr_icon = "mdi:format-list-checks"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, device: PentairDevice, coordinator) -> None:
+        """Initialize the programs sensor."""
+        super().__init__(coordinator)
+        self._device = device
+        self._attr_name = f"{device.nickname} Programs"
+        self._attr_unique_id = f"pentair_{device.pentair_device_id}_programs"
+        self._attr_device_info = device.device_info
+        self._update_from_device()
+
+    def _update_from_device(self) -> None:
+        """Derive the running program states from the cached device status."""
+        programs = {p.name: p.running for p in self._device.programs}
+        self._attr_native_value = sum(programs.values())
+        self._attr_extra_state_attributes = programs
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from coordinator."""
+        self._update_from_device()
+        self.async_write_ha_state()
@@ -1,25 +1,44 @@
 """Platform for switch integration (relay control)."""
 from __future__ import annotations
 
-import asyncio
 import logging
+import time
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity, SwitchDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEBUG_INFO
+from .const import (
+    DOMAIN,
+    RELAY_PROGRAM_HEATER,
+    RELAY_PROGRAM_LIGHTS,
+    SIGNAL_PUMP_SPEED_CHANGED,
+)
 from .pentaircloud_modified import PentairCloudHub, PentairDevice
 
 _LOGGER = logging.getLogger(__name__)
 
 # Default relay program mappings - will be overridden by config
-DEFAULT_RELAY_PROGRAMS = {
-    "lights": 5,   # Program for lights
-    "heater": 6,   # Program for heater
+DEFAULT_RELAY_PROGRAMS = (
+    ("lights", RELAY_PROGRAM_LIGHTS),
+    ("heater", RELAY_PROGRAM_HEATER),
+)
+
+# Relays exposed as switches, with their relay number. Lights are handled
+# as a light entity, so only the heater is a switch.
+_RELAYS = (("heater", 2),)
+
+# How long an optimistic state survives refreshes that still report the old
+# relay state, since the relay bit lags the program change in the cloud
+OPTIMISTIC_HOLD_SECONDS = 15
+
+_ICONS = {
+    "lights": "mdi:lightbulb",
+    "heater": "mdi:fire",
 }
 
 async def async_setup_entry(
@@ -28,29 +47,55 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Pentair relay switches."""
-    hub = hass.data[DOMAIN][config_entry.entry_id]["pentair_cloud_hub"]
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
-    devices: list[PentairDevice] = await hass.async_add_executor_job(hub.get_devices)
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    hub = entry_data["hub"]
+    coordinator = entry_data["coordinator"]
+    devices: list[PentairDevice] = entry_data["devices"]
     
     # Get relay program mappings from config
     relay_programs = {
-        "lights": config_entry.data.get("relay_lights", 5),
-        "heater": config_entry.data.get("relay_heater", 6),
+        name: config_entry.data.get(f"relay_{name}", default)
+        for name, default in DEFAULT_RELAY_PROGRAMS
     }
+    medium_speed_program = config_entry.data.get("speed_medium", 2)
     
-    entities = []
-    
-    for device in devices:
-        # Only create heater switch (lights are handled as light entity)
-        entities.append(PentairRelaySwitch(_LOGGER, hub, device, "heater", 2, relay_programs, coordinator))
+    entities = [
+        PentairRelaySwitch(
+            _LOGGER,
+            hub,
+            device,
+            name,
+            number,
+            relay_programs,
+            medium_speed_program,
+            coordinator,
+        )
+        for device in devices
+        for name, number in _RELAYS
+    ]
     
-    _LOGGER.info(f"Setting up {len(entities)} switch entities")
-    async_add_entities(entities, update_before_add=True)
+    _LOGGER.info("Setting up %s switch entities", len(entities))
+    # The coordinator has already done its first refresh during setup
+    async_add_entities(entities)
 
 
 class PentairRelaySwitch(CoordinatorEntity, SwitchEntity):
     """Representation of a Pentair relay switch."""
     
+    __slots__ = (
+        "_logger",
+        "_hub",
+        "_device",
+        "_relay_name",
+        "_relay_number",
+        "_relay_program_id",
+        "_medium_speed_program",
+        "_pump_speed_changed_signal",
+        "_is_on",
+        "_pending_state",
+        "_optimistic_until",
+    )
+    
     def __init__(
         self,
         logger: logging.Logger,
@@ -59,6 +104,7 @@ class PentairRelaySwitch(CoordinatorEntity, SwitchEntity):
         relay_name: str,
         relay_number: int,
         relay_programs: dict[str, int],
+        medium_speed_program: int,
         coordinator,
     ) -> None:
         """Initialize the relay switch."""
@@ -68,33 +114,21 @@ class PentairRelaySwitch(CoordinatorEntity, SwitchEntity):
         self._device = device
         self._relay_name = relay_name
         self._relay_number = relay_number
-        self._relay_programs = relay_programs
+        self._relay_program_id = relay_programs[relay_name]
+        self._medium_speed_program = medium_speed_program
+        self._pump_speed_changed_signal = SIGNAL_PUMP_SPEED_CHANGED.format(
+            device.pentair_device_id
+        )
         # Cleaner naming
         relay_display_name = "Light" if relay_name == "lights" else relay_name.title()
         self._attr_name = f"{device.nickname} {relay_display_name}"
         self._attr_unique_id = f"pentair_{device.pentair_device_id}_relay_{relay_name}"
-        self._is_on = False
-        
-        # Set icon and device class based on relay type
-        if relay_name == "lights":
-            self._attr_icon = "mdi:lightbulb"
-            # No specific device class for pool lights, but the icon helps
-        elif relay_name == "heater":
-            self._attr_icon = "mdi:fire"
-            # No specific device class for pool heater switch
-    
-    @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {
-                (DOMAIN, f"pentair_{self._device.pentair_device_id}")
-            },
-            "name": self._device.nickname,
-            "model": self._device.nickname,
-            "sw_version": "1.0",
-            "manufacturer": "Pentair",
-        }
+        self._attr_device_info = device.device_info
+        self._is_on = device.relay_states[relay_number - 1]
+        self._pending_state: bool | None = None
+        self._optimistic_until: float | None = None
+        # No specific device class for pool lights or heater, but the icon helps
+        self._attr_icon = _ICONS.get(relay_name)
     
     @property
     def is_on(self) -> bool:
@@ -103,113 +137,122 @@ class PentairRelaySwitch(CoordinatorEntity, SwitchEntity):
     
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the relay."""
-        if DEBUG_INFO:
-            self._logger.info(f"Turning on {self._relay_name}")
+        if self._is_on or self._pending_state is True:
+            return
+        
+        self._logger.debug("Turning on %s", self._relay_name)
+        
+        # Simply activate this relay's program
+        program_id = self._relay_program_id
+        device_id = self._device.pentair_device_id
+        command = (self._hub.activate_program_concurrent, device_id, program_id)
         
         # For heater, ensure pump is running
         if self._relay_name == "heater":
-            if DEBUG_INFO:
-                self._logger.info(
-                    f"Heater switch activated. Pump running: {self._device.pump_running}, "
-                    f"Active pump program: {self._device.active_pump_program}"
-                )
-            
-            if not self._device.pump_running:
-                if DEBUG_INFO:
-                    self._logger.info(
-                        "Heater requested but pump is off - starting pump at medium speed"
-                    )
-            
-            # Get medium speed program from config
-            config_entry = self.hass.config_entries.async_get_entry(
-                list(self.hass.data[DOMAIN].keys())[0]
+            self._logger.debug(
+                "Heater switch activated. Pump running: %s, Active pump program: %s",
+                self._device.pump_running,
+                self._device.active_pump_program,
             )
-            medium_speed_program = config_entry.data.get("speed_medium", 2)
-            
-            # Turn on pump at medium speed
-            await self.hass.async_add_executor_job(
-                self._hub.activate_program_concurrent,
-                self._device.pentair_device_id,
-                medium_speed_program
-            )
-            
-            # Wait a moment for pump to start
-            await asyncio.sleep(2)
             
-            # Force a status update to get the latest pump state
-            await self.hass.async_add_executor_job(
-                self._hub.update_pentair_devices_status
-            )
-            
-            # Wait a bit more for the update to complete
-            await asyncio.sleep(1)
-            
-            # Update pump speed entity to reflect the new speed
-            pump_speed_entity_id = f"number.{self._device.nickname.lower().replace(' ', '_')}_speed_control"
-            try:
-                # Force update of the pump speed entity
-                await self.hass.services.async_call(
-                    "homeassistant",
-                    "update_entity",
-                    {"entity_id": pump_speed_entity_id},
-                    blocking=False
+            if not self._device.pump_running:
+                self._logger.debug(
+                    "Heater requested but pump is off - starting pump at medium speed"
+                )
+                # Start pump, wait for it and start heater in one executor job,
+                # exactly as the climate entity does
+                command = (
+                    self._hub.start_pump_and_program,
+                    device_id,
+                    self._medium_speed_program,
+                    program_id,
                 )
-                if DEBUG_INFO:
-                    self._logger.info(f"Requested update for pump speed entity: {pump_speed_entity_id}")
-            except Exception as e:
-                if DEBUG_INFO:
-                    self._logger.warning(f"Could not update pump speed entity: {e}")
-        
-        # Simply activate this relay's program
-        program_id = self._relay_programs[self._relay_name]
-        
-        await self.hass.async_add_executor_job(
-            self._hub.activate_program_concurrent,
-            self._device.pentair_device_id,
-            program_id
-        )
         
+        # Flip the state right away and let the cloud command catch up
         self._is_on = True
+        self._pending_state = True
+        self.async_write_ha_state()
+        self.hass.async_create_task(
+            self._async_send_command(True, *command),
+            f"pentair_relay_{self._relay_name}_on",
+        )
     
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the relay."""
-        if DEBUG_INFO:
-            self._logger.info(f"Turning off {self._relay_name}")
+        if not self._is_on or self._pending_state is False:
+            return
         
-        # Simply deactivate this relay's program
-        program_id = self._relay_programs[self._relay_name]
+        self._logger.debug("Turning off %s", self._relay_name)
         
-        await self.hass.async_add_executor_job(
-            self._hub.deactivate_program,
-            self._device.pentair_device_id,
-            program_id
+        # Simply deactivate this relay's program
+        self._is_on = False
+        self._pending_state = False
+        self.async_write_ha_state()
+        self.hass.async_create_task(
+            self._async_send_command(
+                False,
+                self._hub.deactivate_program,
+                self._device.pentair_device_id,
+                self._relay_program_id,
+            ),
+            f"pentair_relay_{self._relay_name}_off",
         )
+    
+    async def _async_send_command(self, turn_on: bool, func, *args) -> None:
+        """Send the relay command, reverting the optimistic state on failure."""
+        try:
+            success = await self._hub.async_run(func, *args)
+        except Exception as err:
+            self._logger.error("Error switching %s: %s", self._relay_name, err)
+            success = False
+        finally:
+            if self._pending_state is turn_on:
+                self._pending_state = None
         
-        self._is_on = False
+        if not success:
+            self._logger.error(
+                "Failed to turn %s %s", "on" if turn_on else "off", self._relay_name
+            )
+            self._is_on = not turn_on
+            self._optimistic_until = None
+            self.async_write_ha_state()
+        else:
+            # Give the relay bit time to follow the acknowledged command
+            self._optimistic_until = time.monotonic() + OPTIMISTIC_HOLD_SECONDS
+            if turn_on and self._relay_name == "heater":
+                # Let the pump entity pick up the new speed from the device state
+                async_dispatcher_send(self.hass, self._pump_speed_changed_signal)
+        
+        self.coordinator.async_boost_polling()
+        await self.coordinator.async_request_refresh()
     
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from coordinator."""
         # Use actual relay state from API (s21 for relay1/lights, s22 for relay2/heater)
-        if self._relay_number == 1:
-            self._is_on = getattr(self._device, 'relay1_on', False)
-        elif self._relay_number == 2:
-            self._is_on = getattr(self._device, 'relay2_on', False)
+        reported = self._device.relay_states[self._relay_number - 1]
+        if self._pending_state is not None:
+            # The command is still in flight, the report predates it
+            reported = self._is_on
+        elif self._optimistic_until is not None:
+            if reported == self._is_on or time.monotonic() >= self._optimistic_until:
+                # Confirmed by the cloud, or it never caught up
+                self._optimistic_until = None
+            else:
+                # Keep the optimistic state until the relay catches up
+                reported = self._is_on
+        self._is_on = reported
         
-        if DEBUG_INFO:
+        if self._logger.isEnabledFor(logging.DEBUG):
             # Also log the program state for debugging
-            relay_program_id = self._relay_programs[self._relay_name]
-            for program in self._device.programs:
-                if program.id == relay_program_id:
-                    _LOGGER.debug(
-                        f"{self._relay_name} relay physical state: {self._is_on}, "
-                        f"program {relay_program_id} running: {program.running}"
-                    )
-                break
-        
-        if DEBUG_INFO:
-            self._logger.info(
-                f"Relay {self._relay_name} program {relay_program_id} is {'active' if self._is_on else 'inactive'}"
-            )
+            program = self._device.programs_by_id.get(self._relay_program_id)
+            if program is not None:
+                self._logger.debug(
+                    "%s relay physical state: %s, program %s running: %s",
+                    self._relay_name,
+                    self._is_on,
+                    self._relay_program_id,
+                    program.running,
+                )
         
         self.async_write_ha_state()
\ No newline at end of file